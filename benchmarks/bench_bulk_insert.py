@@ -0,0 +1,82 @@
+"""
+Compares per-row INSERTs with the batched multi-row loader (common/db.py insert_batches) on a season-sized
+player_traditional frame, written to a scratch table that is dropped afterwards. Per-row inserts are only timed
+on the first --row-by-row-rows rows and reported as rows per second.
+
+Usage: python benchmarks/bench_bulk_insert.py [--rows N] [--batch-rows N ...]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.datasets import DATASETS
+from common.db import connect_to_sql, insert_batches
+
+TABLE_NAME = 'bench_bulk_insert'
+
+def make_frame(rows):
+    """A player_traditional-shaped frame: about 450 players a day over a season"""
+    spec = DATASETS['player_traditional']
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((rows, len(spec.columns))).round(3), columns=spec.columns)
+    df.insert(0, 'Date', [date(2024, 10, 22) + timedelta(days=i // 450) for i in range(rows)])
+    df.insert(1, 'Team', 'BOS')
+    df.insert(2, 'Player', [f'Player {i % 450}' for i in range(rows)])
+    return df
+
+def reset_table(cursor, df):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    stat_columns = [f'`{column}` FLOAT' for column in df.columns[3:]]
+    cursor.execute(f'''
+    CREATE TABLE {TABLE_NAME} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        `Date` DATE, Team varchar(255), Player varchar(255),
+        {', '.join(stat_columns)}
+    )
+    ''')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=72000, help='rows in the frame (a season is about 72,000)')
+    parser.add_argument('--row-by-row-rows', type=int, default=2000, help='rows timed with per-row inserts')
+    parser.add_argument('--batch-rows', type=int, nargs='+', default=[100, 1000, 5000], help='batch sizes to time')
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    insert_query = f'''
+    INSERT INTO {TABLE_NAME} ({', '.join(f'`{column}`' for column in df.columns)})
+    VALUES ({', '.join(['%s'] * len(df.columns))})
+    '''
+    rows = list(df.itertuples(index=False, name=None))
+    results = []
+    with connect_to_sql() as (cursor, conn):
+        try:
+            reset_table(cursor, df)
+            start = time.perf_counter()
+            for row in rows[:args.row_by_row_rows]:
+                cursor.execute(insert_query, row)
+            conn.commit()
+            results.append(('row by row', min(len(rows), args.row_by_row_rows), time.perf_counter() - start))
+
+            for batch_rows in args.batch_rows:
+                reset_table(cursor, df)
+                start = time.perf_counter()
+                insert_batches(cursor, conn, insert_query, rows, batch_rows)
+                results.append((f'batches of {batch_rows}', len(rows), time.perf_counter() - start))
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+    print(f"\nInserting a {len(df)} x {len(df.columns)} frame:")
+    print(f"  {'method':<20}{'rows':>8}{'seconds':>10}{'rows/s':>10}{'season (s)':>12}")
+    for method, count, seconds in results:
+        print(f"  {method:<20}{count:>8}{seconds:>10.2f}{count / seconds:>10.0f}{len(rows) * seconds / count:>12.1f}")
+
+if __name__ == '__main__':
+    main()
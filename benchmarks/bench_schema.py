@@ -0,0 +1,92 @@
+"""
+Times the date and game probes the scrapers and models run against the stat tables, and the index MySQL picks
+for each one. Pass --migrate to add the natural keys and secondary indexes (common/schema.py) between two timed
+passes and print the before/after table.
+
+Usage: python benchmarks/bench_schema.py [--migrate] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import gamelogs, leaguedash, registry
+from common.datasets import DATASETS
+from common.db import connect_to_sql
+
+def get_probes(cursor):
+    """Representative queries for every stat table that exists: (table, label, query, params)"""
+    cursor.execute("SHOW TABLES")
+    tables = set(row[0] for row in cursor.fetchall())
+    probes = []
+    for table_name in list(DATASETS) + list(gamelogs.GAME_LOGS) + ['player_boxscore']:
+        if table_name not in tables:
+            continue
+        cursor.execute(f"SELECT MIN(Date), MAX(Date) FROM {table_name}")
+        first_date, last_date = cursor.fetchone()
+        if first_date is None:
+            continue
+        probes.append((table_name, 'dates in range',
+                       f"SELECT DISTINCT Date FROM {table_name} WHERE Date BETWEEN %s AND %s",
+                       (first_date, last_date)))
+        probes.append((table_name, 'one date', f"SELECT * FROM {table_name} WHERE Date = %s", (last_date,)))
+        if table_name == 'player_boxscore':
+            cursor.execute("SELECT GameID FROM player_boxscore WHERE Date = %s LIMIT 1", (last_date,))
+            game = cursor.fetchone()
+            if game:
+                probes.append((table_name, 'one game', "SELECT * FROM player_boxscore WHERE GameID = %s", game))
+    return probes
+
+def time_probe(cursor, query, params, repeat):
+    """Returns the median time in ms of a query and the index MySQL uses for it"""
+    cursor.execute(f"EXPLAIN {query}", params)
+    plan = dict(zip([column[0] for column in cursor.description], cursor.fetchone()))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), plan['key'] or f"none ({plan['type']})"
+
+def run_probes(cursor, probes, repeat):
+    return [time_probe(cursor, query, params, repeat) for _, _, query, params in probes]
+
+def migrate(cursor, conn):
+    """Adds the natural keys and indexes to every stat table through its own create_table"""
+    for spec in DATASETS.values():
+        leaguedash.create_table(cursor, conn, spec)
+    for table_name in gamelogs.GAME_LOGS:
+        gamelogs.create_table(cursor, conn, table_name)
+    registry.load_module('player_boxscore').create_table(cursor, conn, 'player_boxscore')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--migrate', action='store_true', help='migrate the tables between two timed passes')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query (the median is reported)')
+    args = parser.parse_args()
+
+    with connect_to_sql() as (cursor, conn):
+        probes = get_probes(cursor)
+        before = run_probes(cursor, probes, args.repeat)
+        after = None
+        if args.migrate:
+            start = time.perf_counter()
+            migrate(cursor, conn)
+            conn.commit()
+            print(f"Migrated the stat tables in {time.perf_counter() - start:.1f}s")
+            after = run_probes(cursor, probes, args.repeat)
+
+    header = f"\n  {'table':<24}{'query':<16}{'ms':>9}  {'index':<20}"
+    print(header + (f"{'ms after':>9}  index after" if after else ""))
+    for i, (table_name, label, _, _) in enumerate(probes):
+        line = f"  {table_name:<24}{label:<16}{before[i][0]:>9.2f}  {before[i][1]:<20}"
+        if after:
+            line += f"{after[i][0]:>9.2f}  {after[i][1]}"
+        print(line)
+
+if __name__ == '__main__':
+    main()
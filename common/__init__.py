@@ -0,0 +1 @@
+"""Shared modules used by the scrapers and the models"""
@@ -0,0 +1,27 @@
+"""asyncio fetch engine that keeps several date windows in flight under the global rate budget"""
+import asyncio
+
+from common import config
+
+async def _fetch_window(semaphore, fetch_window, window):
+    """Runs one blocking fetch-and-parse in a worker thread once a concurrency slot is free"""
+    async with semaphore:
+        try:
+            return window, await asyncio.to_thread(fetch_window, *window)
+        except Exception as e:
+            print(f"An error occurred fetching {window}:", e)
+            return window, None
+
+async def _fetch_windows(fetch_window, windows, on_result, max_concurrency):
+    """Schedules every window and hands results back in completion order"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [asyncio.create_task(_fetch_window(semaphore, fetch_window, window)) for window in windows]
+    for next_done in asyncio.as_completed(tasks):
+        window, result = await next_done
+        on_result(window, result)
+
+def fetch_windows(fetch_window, windows, on_result, max_concurrency=None):
+    """Calls `fetch_window(*window)` for every window concurrently and `on_result(window, result)` as each finishes"""
+    if not windows:
+        return
+    asyncio.run(_fetch_windows(fetch_window, windows, on_result, max_concurrency or config.NBA_API_CONCURRENCY))
@@ -0,0 +1,80 @@
+"""Settings shared by every script, loaded once from the .env file"""
+import os
+import tempfile
+from dotenv import load_dotenv
+
+# Load the .env file
+load_dotenv()
+
+# MySQL connection settings
+DB_HOST = os.getenv("DB_HOST")
+DB_USER = os.getenv("DB_USER")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_NAME = os.getenv("DB_NAME")
+
+# Connections each process keeps open to MySQL (callers wait for a free one beyond that; the connector caps it at 32)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+# Global stats.nba.com budget shared by every scraper process
+NBA_API_RATE = float(os.getenv("NBA_API_RATE", "1.5"))  # Requests per second
+NBA_API_BURST = int(os.getenv("NBA_API_BURST", "3"))  # Requests allowed back to back after an idle period
+NBA_API_RATE_LIMIT_FILE = os.getenv(
+    "NBA_API_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "nba_api_rate_limit.json")
+)
+
+# Where scrapers checkpoint fetched windows until they reach MySQL
+SCRAPE_JOURNAL_DIR = os.getenv(
+    "SCRAPE_JOURNAL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".scrape_journal")
+)
+
+# Retries for a failed stats.nba.com request before the scraper gives up on it
+NBA_API_RETRIES = int(os.getenv("NBA_API_RETRIES", "2"))
+
+# JSON lines file that every stage appends its telemetry to (set to an empty string to disable)
+TELEMETRY_PATH = os.getenv(
+    "TELEMETRY_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "telemetry.jsonl")
+)
+
+# Max stats.nba.com requests a scraper keeps in flight at once (the global rate budget still applies)
+NBA_API_CONCURRENCY = int(os.getenv("NBA_API_CONCURRENCY", "4"))
+
+# Streaming pipeline: parsed windows buffered between the fetcher and the MySQL writer, and rows per write batch
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_BATCH_ROWS = int(os.getenv("PIPELINE_BATCH_ROWS", "5000"))
+
+# Rows per multi-row INSERT statement and per transaction when bulk loading into MySQL
+DB_BATCH_ROWS = int(os.getenv("DB_BATCH_ROWS", "1000"))
+
+# Rows fetched from MySQL per round trip when reading a table into a DataFrame
+DB_FETCH_ROWS = int(os.getenv("DB_FETCH_ROWS", "10000"))
+
+# Seconds a snapshot table refresh waits for an overlapping refresh of the same table before giving up
+DB_SNAPSHOT_LOCK_TIMEOUT = int(os.getenv("DB_SNAPSHOT_LOCK_TIMEOUT", "300"))
+
+# Completed stats.nba.com responses kept in memory so scrapers asking for the same request share one call
+NBA_API_RECENT_RESPONSES = int(os.getenv("NBA_API_RECENT_RESPONSES", "32"))
+
+# On-disk cache of raw stats.nba.com responses (set to an empty string to disable). Responses covering days
+# before yesterday are kept forever; more recent ones expire after NBA_API_CACHE_TTL seconds.
+NBA_API_CACHE_DIR = os.getenv(
+    "NBA_API_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".api_cache")
+)
+NBA_API_CACHE_TTL = int(os.getenv("NBA_API_CACHE_TTL", "3600"))
+
+# Local Parquet copy of the dated tables the models read, synced incrementally (set to an empty string to disable)
+FEATURE_CACHE_DIR = os.getenv(
+    "FEATURE_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".feature_cache")
+)
+
+# Compute player_traditional / opp_traditional from ingested game logs with a local sliding window
+# instead of one LeagueDash request per target date
+ROLLING_FROM_GAMELOGS = os.getenv("ROLLING_FROM_GAMELOGS", "false").lower() in ("1", "true", "yes")
+
+# Fill player_boxscore dates older than the target date from the league-wide player game logs (a few requests per
+# season) instead of one box score request per game; the target date keeps the per-game path
+BOXSCORE_BULK_INGEST = os.getenv("BOXSCORE_BULK_INGEST", "true").lower() in ("1", "true", "yes")
+
+# Persistent memo of raw player names and their normalized form (set to an empty string to disable)
+NAME_MEMO_PATH = os.getenv(
+    "NAME_MEMO_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".name_memo.json")
+)
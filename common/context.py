@@ -0,0 +1,11 @@
+"""Run context handed to every scraper entry point"""
+from datetime import date, timedelta
+
+class ScraperContext:
+    """Dates and settings shared by every scraper in a run"""
+
+    def __init__(self, today=None, season_start=date(2024, 11, 1), backfill=False):
+        self.today = today or date.today()
+        self.target_date = self.today - timedelta(days=1)  # Latest completed day of games
+        self.season_start = season_start
+        self.backfill = backfill  # Fill every missing date from season_start, not just the recent ones
@@ -0,0 +1,136 @@
+"""Specs for every LeagueDash dataset: adding a dataset is a new entry here, not a new scraper"""
+from nba_api.stats.endpoints import (LeagueDashOppPtShot, LeagueDashPlayerPtShot, LeagueDashPlayerShotLocations,
+                                     LeagueDashPlayerStats, LeagueDashTeamShotLocations, LeagueDashTeamStats)
+
+from common.leaguedash import DatasetSpec
+
+# Column mappings shared by the playtype datasets, one per general range
+PLAYTYPES = {
+    'Catch and Shoot': {'FG2M': '2FGM_cns', 'FG2A': '2FGA_cns', 'FG3A': '3PA_cns', 'FG3M': '3PM_cns'},
+    'Pullups': {'FG2M': '2FGM_pullup', 'FG2A': '2FGA_pullup', 'FG3A': '3PA_pullup', 'FG3M': '3PM_pullup'},
+    'Less Than 10 ft': {'FG2M': '2FGM_less10', 'FG2A': '2FGA_less10'}
+}
+
+# Short labels for the shot location zones (Corner 3 must come after Left/Right Corner 3)
+ZONES = {
+    'Restricted Area': 'RA', 'In The Paint (Non-RA)': 'Paint', 'Mid-Range': 'Mid', 'Left Corner 3': 'LC3',
+    'Right Corner 3': 'RC3', 'Above the Break 3': 'AB3', 'Corner 3': 'C3'
+}
+
+def playtype_variants(prefix=''):
+    """One request per playtype, each renaming FG2M/FG2A/FG3M/FG3A to that playtype's columns"""
+    return [
+        {'params': {'general_range_nullable': playtype},
+         'mapping': {original: prefix + short_label for original, short_label in mapping.items()}}
+        for playtype, mapping in PLAYTYPES.items()
+    ]
+
+def playtype_columns(prefix=''):
+    return [prefix + short_label for mapping in PLAYTYPES.values() for short_label in mapping.values()]
+
+def zone_mapping(stat_prefix='', label_prefix=''):
+    return {f'{zone}_{stat_prefix}{stat}': f'{label_prefix}{short_label}_{stat}'
+            for stat in ('FGM', 'FGA') for zone, short_label in ZONES.items()}
+
+def zone_columns(prefix=''):
+    return [f'{prefix}{short_label}_{stat}' for short_label in ZONES.values() for stat in ('FGM', 'FGA')]
+
+PLAYER_TRADITIONAL_STATS = ['GP', 'W', 'L', 'W_PCT', 'MIN', 'FGM', 'FGA', 'FG_PCT', '3PM', '3PA', '3P_PCT', 'FTM',
+                            'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'BLKA', 'PF', 'PFD',
+                            'PPG', 'PLUS_MINUS', 'NBA_FANTASY_PPG', 'DD2', 'TD3']
+
+OPP_TRADITIONAL_STATS = ['OPP_FGM', 'OPP_FGA', 'OPP_FG_PCT', 'OPP_3PM', 'OPP_3PA', 'OPP_3P_PCT', 'OPP_FTM',
+                         'OPP_FTA', 'OPP_FT_PCT', 'OPP_OREB', 'OPP_DREB', 'OPP_REB', 'OPP_AST', 'OPP_TOV',
+                         'OPP_STL', 'OPP_BLK', 'OPP_BLKA', 'OPP_PF', 'OPP_PFD', 'OPP_PTS', 'PLUS_MINUS']
+
+PLAYER_MISC_STATS = ['PTS_OFF_TOV', 'PTS_2ND_CHANCE', 'PTS_FB', 'PTS_PAINT']
+
+PLAYER_USAGE_STATS = ['USG_PCT', 'PCT_FGA', 'PCT_FG3A', 'PCT_FTA', 'PCT_OREB', 'PCT_DREB', 'PCT_AST', 'PCT_TOV',
+                      'PCT_STL', 'PCT_BLK', 'PCT_PTS']
+
+DATASETS = {
+    'player_traditional': DatasetSpec(
+        table='player_traditional',
+        label='Player Traditional',
+        endpoint=LeagueDashPlayerStats,
+        params={'per_mode_detailed': 'PerGame'},
+        columns=['AGE'] + PLAYER_TRADITIONAL_STATS + [f'{stat}_RANK' for stat in PLAYER_TRADITIONAL_STATS],
+        team_column='TEAM_ABBREVIATION',
+        player_column='PLAYER_NAME',
+        mapping={'FG3M': '3PM', 'FG3A': '3PA', 'FG3_PCT': '3P_PCT', 'PTS': 'PPG'}
+    ),
+    'player_misc': DatasetSpec(
+        table='player_misc',
+        label='Player Misc',
+        endpoint=LeagueDashPlayerStats,
+        params={'measure_type_detailed_defense': 'Misc', 'per_mode_detailed': 'PerGame'},
+        columns=PLAYER_MISC_STATS + [f'{stat}_RANK' for stat in PLAYER_MISC_STATS],
+        team_column='TEAM_ABBREVIATION',
+        player_column='PLAYER_NAME'
+    ),
+    'player_usage': DatasetSpec(
+        table='player_usage',
+        label='Player Usage',
+        endpoint=LeagueDashPlayerStats,
+        params={'measure_type_detailed_defense': 'Usage', 'per_mode_detailed': 'PerGame'},
+        columns=PLAYER_USAGE_STATS,
+        team_column='TEAM_ABBREVIATION',
+        player_column='PLAYER_NAME'
+    ),
+    'player_playtype': DatasetSpec(
+        table='player_playtype',
+        label='Player Playtype',
+        endpoint=LeagueDashPlayerPtShot,
+        params={'per_mode_simple': 'PerGame'},
+        columns=playtype_columns(),
+        team_column='PLAYER_LAST_TEAM_ABBREVIATION',
+        player_column='PLAYER_NAME',
+        team_id_column='PLAYER_LAST_TEAM_ID',
+        variants=playtype_variants()
+    ),
+    'player_shot_locations': DatasetSpec(
+        table='player_shot_locations',
+        label='Player Shot Location',
+        endpoint=LeagueDashPlayerShotLocations,
+        params={'distance_range': 'By Zone', 'per_mode_detailed': 'PerGame'},
+        columns=zone_columns(),
+        team_column='TEAM_ABBREVIATION',
+        player_column='PLAYER_NAME',
+        mapping=zone_mapping()
+    ),
+    'opp_traditional': DatasetSpec(
+        table='opp_traditional',
+        label='Opponent Traditional',
+        endpoint=LeagueDashTeamStats,
+        params={'per_mode_detailed': 'PerGame', 'measure_type_detailed_defense': 'Opponent'},
+        columns=OPP_TRADITIONAL_STATS + [f'{stat}_RANK' for stat in OPP_TRADITIONAL_STATS],
+        team_column='TEAM_NAME',
+        mapping={'OPP_FG3M': 'OPP_3PM', 'OPP_FG3A': 'OPP_3PA', 'OPP_FG3_PCT': 'OPP_3P_PCT'}
+    ),
+    'opp_misc': DatasetSpec(
+        table='opp_misc',
+        label='Opponent Misc',
+        endpoint=LeagueDashTeamStats,
+        params={'per_mode_detailed': 'PerGame', 'measure_type_detailed_defense': 'Misc'},
+        columns=[f'OPP_{stat}' for stat in PLAYER_MISC_STATS],
+        team_column='TEAM_NAME'
+    ),
+    'opp_playtype': DatasetSpec(
+        table='opp_playtype',
+        label='Opponent Playtype',
+        endpoint=LeagueDashOppPtShot,
+        params={'per_mode_simple': 'PerGame'},
+        columns=playtype_columns('Opp_'),
+        team_column='TEAM_ABBREVIATION',
+        variants=playtype_variants('Opp_')
+    ),
+    'opp_shot_locations': DatasetSpec(
+        table='opp_shot_locations',
+        label='Opponent Shot Location',
+        endpoint=LeagueDashTeamShotLocations,
+        params={'distance_range': 'By Zone', 'per_mode_detailed': 'PerGame', 'measure_type_simple': 'Opponent'},
+        columns=zone_columns('Opp_'),
+        team_column='TEAM_NAME',
+        mapping=zone_mapping('OPP_', 'Opp_')
+    ),
+}
@@ -0,0 +1,153 @@
+"""Pooled MySQL connections shared by every script"""
+import threading
+from contextlib import contextmanager
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+from mysql.connector import FieldType, pooling
+
+from common import config
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(config.DB_POOL_SIZE)
+
+def get_pool():
+    """Creates the process-wide connection pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name='nba',
+                pool_size=config.DB_POOL_SIZE,
+                host=config.DB_HOST,
+                user=config.DB_USER,
+                password=config.DB_PASSWORD,
+                database=config.DB_NAME
+            )
+        return _pool
+
+@contextmanager
+def connect_to_sql():
+    """Borrows a pooled connection and a cursor, returning the connection to the pool afterwards"""
+    conn = None
+    cursor = None  # Initialize cursor to None
+    # The pool raises instead of waiting when every connection is taken, so wait for a free slot here
+    _pool_slots.acquire()
+    try:
+        conn = get_pool().get_connection()
+        # Reconnect if the server dropped the connection while it sat in the pool
+        conn.ping(reconnect=True, attempts=3, delay=1)
+        cursor = conn.cursor()
+        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+        raise  # Re-raise the exception to handle it outside
+    finally:
+        # Close the cursor and hand the connection back (its session, including any uncommitted work, is reset)
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+        _pool_slots.release()
+
+# numpy dtype each MySQL column type is read into (anything else, e.g. strings, stays object). FLOAT columns are
+# single precision in MySQL, so float32 keeps every digit they hold at half the memory of float64.
+INT_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG, FieldType.YEAR}
+DTYPES = {
+    **{field_type: np.dtype(np.int64) for field_type in INT_TYPES},
+    FieldType.FLOAT: np.dtype(np.float32),
+    FieldType.DOUBLE: np.dtype(np.float64),
+    FieldType.DECIMAL: np.dtype(np.float64),
+    FieldType.NEWDECIMAL: np.dtype(np.float64),
+    FieldType.DATE: np.dtype('datetime64[D]'),
+    FieldType.NEWDATE: np.dtype('datetime64[D]'),
+}
+
+def fetch_chunks(cursor, chunk_rows=None):
+    """Yields the rows of an executed query in chunks as they arrive (the default cursor is unbuffered, so the
+    server streams them instead of the client holding the whole result)"""
+    chunk_rows = chunk_rows or config.DB_FETCH_ROWS
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield rows
+
+def read_frame(cursor, row_count=None, chunk_rows=None):
+    """Builds a DataFrame from an executed query, copying each chunk straight into preallocated typed columns
+
+    Only one chunk of Python tuples exists at a time, so memory stays near the size of the final frame. `row_count`
+    is the expected number of rows; the columns grow if more arrive and are trimmed if fewer do.
+    """
+    names = [column[0] for column in cursor.description]
+    dtypes = [DTYPES.get(column[1], np.dtype(object)) for column in cursor.description]
+    capacity = row_count or config.DB_FETCH_ROWS
+    values = [np.empty(capacity, dtype=dtype) for dtype in dtypes]
+    nulls = [np.zeros(capacity, dtype=bool) if dtype.kind == 'i' else None for dtype in dtypes]
+
+    filled = 0
+    for rows in fetch_chunks(cursor, chunk_rows):
+        end = filled + len(rows)
+        if end > capacity:
+            capacity = max(end, capacity * 2)
+            values = [np.resize(column, capacity) for column in values]
+            nulls = [None if column is None else np.resize(column, capacity) for column in nulls]
+        for i, column in enumerate(zip(*rows)):
+            if dtypes[i].kind == 'i':
+                nulls[i][filled:end] = [value is None for value in column]
+                values[i][filled:end] = [0 if value is None else value for value in column]
+            elif dtypes[i].kind in 'fM':
+                values[i][filled:end] = np.array(column, dtype=dtypes[i])  # None becomes NaN / NaT
+            else:
+                values[i][filled:end] = column
+        filled = end
+
+    columns = {}
+    for name, column, null in zip(names, values, nulls):
+        # Copy when trimming so the unused capacity is freed
+        column = column if filled == capacity else column[:filled].copy()
+        if null is not None and null[:filled].any():
+            column = pd.arrays.IntegerArray(column, null[:filled].copy())  # Ints with NULLs become Int64
+        elif column.dtype.kind == 'M':
+            column = column.astype('datetime64[ns]')
+        columns[name] = column
+    return pd.DataFrame(columns, columns=names, copy=False)
+
+def insert_batches(cursor, conn, query, rows, batch_rows=None):
+    """Inserts rows in chunks of multi-row INSERTs (executemany), committing each chunk as its own transaction"""
+    batch_rows = batch_rows or config.DB_BATCH_ROWS
+    for start in range(0, len(rows), batch_rows):
+        cursor.executemany(query, rows[start:start + batch_rows])
+        conn.commit()
+
+def load_snapshot(cursor, conn, table_name, create_table, columns, rows):
+    """Replaces a table's contents without readers ever seeing it empty or half loaded
+
+    The rows are loaded into a staging table made by `create_table(cursor, name)`, then one RENAME TABLE swaps it
+    with the live table atomically. Refreshes of the same table hold a named MySQL lock from the load to the swap,
+    so an overlapping refresh waits instead of dropping or renaming this one's staging table.
+    """
+    staging_table, old_table = f'{table_name}_staging', f'{table_name}_old'
+    lock_name = f'snapshot:{table_name}'
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (lock_name, config.DB_SNAPSHOT_LOCK_TIMEOUT))
+    if cursor.fetchone()[0] != 1:
+        raise RuntimeError(f'Timed out waiting for another refresh of {table_name}')
+    try:
+        # Leftovers of a refresh that crashed before its swap
+        cursor.execute(f"DROP TABLE IF EXISTS {staging_table}, {old_table}")
+        create_table(cursor, staging_table)
+        insert_query = f'''
+        INSERT INTO {staging_table} ({', '.join(f'`{column}`' for column in columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        '''
+        insert_batches(cursor, conn, insert_query, rows)
+
+        # The first load has no live table to swap out
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} LIKE {staging_table}")
+        cursor.execute(f"RENAME TABLE {table_name} TO {old_table}, {staging_table} TO {table_name}")
+        cursor.execute(f"DROP TABLE {old_table}")
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+        cursor.fetchone()
@@ -0,0 +1,179 @@
+"""Players and teams keyed by their NBA IDs, and the aliases every scraper resolves names into at ingest
+
+stats.nba.com rows carry PLAYER_ID and TEAM_ID, which are stored as they are and registered here. Sources that only
+have names (DraftKings, ESPN, nba.com game cards) are resolved through the alias tables once, when they are scraped,
+so the models join every table on integer IDs instead of matching name strings.
+"""
+import pandas as pd
+from nba_api.stats.static import players, teams
+
+from common import names
+from common.db import insert_batches
+
+TEAMS_TABLE = 'teams'
+PLAYERS_TABLE = 'players'
+TEAM_ALIASES_TABLE = 'team_aliases'
+PLAYER_ALIASES_TABLE = 'player_aliases'
+
+# Team names used by LeagueDash and ESPN that differ from the nba_api static full names
+TEAM_NAMES = {'LA Clippers': 'LAC'}
+
+# Names other sources use for a player, mapped to the name NBA.com uses
+PLAYER_ALIASES = {
+    'Cameron Thomas': 'Cam Thomas',
+    'Nicolas Claxton': 'Nic Claxton',
+    'Robert Williams': 'Robert Williams III',
+    'Alexandre Sarr': 'Alex Sarr',
+    'Carlton Carrington': 'Bub Carrington',
+    'Jaylin Williams (OKC)': 'Jaylin Williams',
+    'Jimmy Butler': 'Jimmy Butler III',
+}
+
+# Alias -> ID maps loaded once per process (kept in sync with what this process registers)
+_ids = {}
+_seeded = False
+
+def create_tables(cursor):
+    """Creates the dimension and alias tables if they do not exist"""
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {TEAMS_TABLE} (
+        TEAM_ID INT PRIMARY KEY,
+        Team VARCHAR(255),
+        Name VARCHAR(255)
+    )
+    ''')
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {PLAYERS_TABLE} (
+        PLAYER_ID INT PRIMARY KEY,
+        Player VARCHAR(255),
+        TEAM_ID INT
+    )
+    ''')
+    for table_name, id_column in ((TEAM_ALIASES_TABLE, 'TEAM_ID'), (PLAYER_ALIASES_TABLE, 'PLAYER_ID')):
+        cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            Alias VARCHAR(255) PRIMARY KEY,
+            {id_column} INT
+        )
+        ''')
+
+def upsert(cursor, conn, table_name, columns, rows, overwrite=True):
+    """Inserts rows in multi-row batches, each committed as its own short transaction
+
+    Rows with an existing primary key overwrite it, or are skipped when `overwrite` is False. Callers sort the rows by
+    primary key so concurrent scrapers lock them in the same order.
+    """
+    if overwrite:
+        updates = ', '.join(f'{column} = VALUES({column})' for column in columns[1:])
+    else:
+        updates = f'{columns[0]} = {columns[0]}'  # No-op; INSERT IGNORE would not be batched by the connector
+    query = f'''
+    INSERT INTO {table_name} ({', '.join(columns)})
+    VALUES ({', '.join(['%s'] * len(columns))})
+    ON DUPLICATE KEY UPDATE {updates}
+    '''
+    insert_batches(cursor, conn, query, rows)
+
+def seed(cursor, conn):
+    """Fills the dimensions from the nba_api static team and player lists (no request) plus the known aliases
+
+    Everything is committed before the process marks itself seeded, so a caller's rollback cannot undo it.
+    """
+    global _seeded
+    create_tables(cursor)
+    if _seeded:
+        return
+    static_teams = teams.get_teams()
+    upsert(cursor, conn, TEAMS_TABLE, ['TEAM_ID', 'Team', 'Name'],
+           sorted((team['id'], team['abbreviation'], team['full_name']) for team in static_teams))
+    team_ids = {team['abbreviation']: team['id'] for team in static_teams}
+    team_aliases = {alias: team['id'] for team in static_teams
+                    for alias in (team['abbreviation'], team['full_name'], team['nickname'])}
+    team_aliases.update({alias: team_ids[abbreviation] for alias, abbreviation in TEAM_NAMES.items()})
+    upsert(cursor, conn, TEAM_ALIASES_TABLE, ['Alias', 'TEAM_ID'], sorted(team_aliases.items()))
+
+    # Inactive players first so an active player wins a shared name; rows registered from the API are kept
+    static_players = sorted(players.get_players(), key=lambda player: player['is_active'])
+    player_names = names.normalize([player['full_name'] for player in static_players])
+    upsert(cursor, conn, PLAYERS_TABLE, ['PLAYER_ID', 'Player'],
+           sorted((player['id'], name) for player, name in zip(static_players, player_names)), overwrite=False)
+    player_aliases = {name: player['id'] for player, name in zip(static_players, player_names)}
+    upsert(cursor, conn, PLAYER_ALIASES_TABLE, ['Alias', 'PLAYER_ID'], sorted(player_aliases.items()),
+           overwrite=False)
+    cursor.execute(f"SELECT Alias, PLAYER_ID FROM {PLAYER_ALIASES_TABLE}")
+    player_ids = dict(cursor.fetchall())
+    upsert(cursor, conn, PLAYER_ALIASES_TABLE, ['Alias', 'PLAYER_ID'],
+           sorted((names.normalize_name(alias), player_ids[names.normalize_name(name)])
+                  for alias, name in PLAYER_ALIASES.items() if names.normalize_name(name) in player_ids))
+    conn.commit()
+    _seeded = True
+
+def get_ids(cursor, conn, kind):
+    """Returns the alias -> ID map of 'team' or 'player', read from MySQL once per process"""
+    if kind not in _ids:
+        seed(cursor, conn)
+        table_name = TEAM_ALIASES_TABLE if kind == 'team' else PLAYER_ALIASES_TABLE
+        cursor.execute(f"SELECT * FROM {table_name}")
+        aliases = cursor.fetchall()
+        _ids[kind] = dict(zip(names.normalize([alias for alias, _ in aliases]), [id_ for _, id_ in aliases]))
+    return _ids[kind]
+
+def resolve(cursor, conn, kind, raw_names):
+    """Maps a column of team or player names to their IDs (None, with a warning, for names with no alias)
+
+    Each distinct name is looked up once. The IDs are Python ints, so they can be inserted as they are.
+    """
+    ids = get_ids(cursor, conn, kind)
+    unique = pd.unique(raw_names.dropna())
+    lookup = {name: ids.get(normalized) for name, normalized in zip(unique, names.normalize(unique))}
+    for name, id_ in lookup.items():
+        if id_ is None:
+            print(f"WARNING: {kind} {name} not found on NBA.com")
+    return pd.Series([lookup.get(name) for name in raw_names], index=raw_names.index, dtype=object)
+
+def resolve_teams(cursor, conn, raw_names):
+    return resolve(cursor, conn, 'team', pd.Series(raw_names, dtype=object))
+
+def resolve_players(cursor, conn, raw_names):
+    return resolve(cursor, conn, 'player', pd.Series(raw_names, dtype=object))
+
+def register_players(cursor, conn, data):
+    """Adds the players of stats.nba.com rows (PLAYER_ID, Player and TEAM_ID columns) to the dimension
+
+    New players and name changes become aliases, so name-only sources resolve to them from then on. The dimension
+    rows are committed on their own, before the caller writes its facts, and in key order so scrapers running at the
+    same time do not deadlock on them.
+    """
+    seed(cursor, conn)
+    latest = data[['PLAYER_ID', 'Player', 'TEAM_ID']].dropna().drop_duplicates('PLAYER_ID', keep='last')
+    rows = sorted((int(player_id), player, int(team_id))
+                  for player_id, player, team_id in latest.itertuples(index=False))
+    upsert(cursor, conn, PLAYERS_TABLE, ['PLAYER_ID', 'Player', 'TEAM_ID'], rows)
+    known = get_ids(cursor, conn, 'player')
+    normalized = names.normalize([player for _, player, _ in rows])
+    aliases = sorted(set((alias, player_id) for (player_id, _, _), alias in zip(rows, normalized)
+                         if known.get(alias) != player_id))
+    if aliases:
+        upsert(cursor, conn, PLAYER_ALIASES_TABLE, ['Alias', 'PLAYER_ID'], aliases)
+        known.update(aliases)
+
+def add_id_columns(cursor, conn, table_name, team_columns=None, player_columns=None):
+    """Adds ID columns to a table created before it stored them, filling the existing rows from the aliases
+
+    `team_columns` and `player_columns` map each ID column to the name column it is resolved from.
+    """
+    seed(cursor, conn)
+    cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+    existing = set(row[0] for row in cursor.fetchall())
+    for aliases_table, alias_id, columns in ((TEAM_ALIASES_TABLE, 'TEAM_ID', team_columns or {}),
+                                             (PLAYER_ALIASES_TABLE, 'PLAYER_ID', player_columns or {})):
+        for id_column, name_column in columns.items():
+            if id_column in existing:
+                continue
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {id_column} INT")
+            cursor.execute(f'''
+            UPDATE {table_name}
+            JOIN {aliases_table} ON {aliases_table}.Alias = {table_name}.`{name_column}`
+            SET {table_name}.{id_column} = {aliases_table}.{alias_id}
+            ''')
+            conn.commit()
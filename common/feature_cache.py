@@ -0,0 +1,141 @@
+"""Local Parquet copy of the dated MySQL tables, synced incrementally before the models read them
+
+Each table is stored as one Parquet file per Date next to a metadata file with the Date watermark and a fingerprint
+(row count and checksum) of every date. A sync fetches the rows past the watermark in one range query, plus the
+older dates whose fingerprint changed in MySQL (e.g. a rescraped window), so a training run only transfers what is
+new instead of the whole season.
+"""
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from common import config
+from common.db import connect_to_sql, read_frame
+
+# Tables already synced by this process, and whether the cache holds them
+_synced = {}
+
+def enabled():
+    return bool(config.FEATURE_CACHE_DIR)
+
+def _table_dir(table_name):
+    return os.path.join(config.FEATURE_CACHE_DIR, table_name)
+
+def _meta_path(table_name):
+    return os.path.join(_table_dir(table_name), '_meta.json')
+
+def _date_path(table_name, day):
+    """Returns the Parquet file of one date (YYYY-MM-DD)"""
+    return os.path.join(_table_dir(table_name), f'{day}.parquet')
+
+def _write(path, write):
+    """Writes to a temp file first so a crash never leaves half a file
+
+    The temp file is per process because train_model and test_model can sync the same table at once.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def load_meta(table_name):
+    """Returns the cached columns, watermark and per-date fingerprints of a table, or None if it is not cached"""
+    try:
+        with open(_meta_path(table_name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_meta(path, meta):
+    with open(path, 'w') as f:
+        json.dump(meta, f)
+
+def get_columns(cursor, table_name):
+    """Returns the columns of a table except its surrogate id"""
+    cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+    return [row[0] for row in cursor.fetchall() if row[0] != 'id']
+
+def get_fingerprints(cursor, table_name, columns):
+    """Returns {date: 'row count:checksum'}, computed in MySQL so only one row per date is transferred"""
+    row_text = ', '.join(f'`{column}`' for column in columns)
+    cursor.execute(f'''
+    SELECT `Date`, COUNT(*), SUM(CRC32(CONCAT_WS('|', {row_text})))
+    FROM {table_name}
+    GROUP BY `Date`
+    ''')
+    return {day.isoformat(): f'{count}:{checksum}' for day, count, checksum in cursor.fetchall() if day is not None}
+
+def get_row_count(fingerprints, days):
+    """Rows MySQL holds for some dates, from their fingerprints"""
+    return sum(int(fingerprints[day].split(':')[0]) for day in days)
+
+def fetch_rows(cursor, table_name, columns, condition, params, row_count):
+    """Streams the matching rows into a DataFrame (the fingerprints already give the row count)"""
+    cursor.execute(f"SELECT {', '.join(f'`{column}`' for column in columns)} FROM {table_name} WHERE {condition}",
+                   params)
+    return read_frame(cursor, row_count)
+
+def sync(table_name):
+    """Brings the cache of a table up to date; returns False for tables without a Date column"""
+    with connect_to_sql() as (cursor, conn):
+        columns = get_columns(cursor, table_name)
+        if 'Date' not in columns:
+            return False
+        fingerprints = get_fingerprints(cursor, table_name, columns)
+
+        meta = load_meta(table_name)
+        if meta is None or meta['columns'] != columns:
+            # New table or changed schema: start over
+            shutil.rmtree(_table_dir(table_name), ignore_errors=True)
+            meta = {'columns': columns, 'watermark': None, 'fingerprints': {}}
+        os.makedirs(_table_dir(table_name), exist_ok=True)
+
+        watermark = meta['watermark']
+        changed = sorted(day for day, fingerprint in fingerprints.items()
+                         if (watermark is None or day <= watermark) and meta['fingerprints'].get(day) != fingerprint)
+        new = [day for day in fingerprints if watermark is None or day > watermark]
+        frames = []
+        if watermark is None:
+            frames.append(fetch_rows(cursor, table_name, columns, "TRUE", [], get_row_count(fingerprints, new)))
+        else:
+            frames.append(fetch_rows(cursor, table_name, columns, "`Date` > %s", [watermark],
+                                     get_row_count(fingerprints, new)))
+            if changed:
+                frames.append(fetch_rows(cursor, table_name, columns,
+                                         f"`Date` IN ({', '.join(['%s'] * len(changed))})", changed,
+                                         get_row_count(fingerprints, changed)))
+
+    rows = pd.concat(frames, ignore_index=True)
+    for day, day_rows in rows.groupby('Date'):
+        _write(_date_path(table_name, day.strftime('%Y-%m-%d')), lambda path: day_rows.to_parquet(path, index=False))
+    # Dates deleted from MySQL are deleted from the cache too
+    for day in set(meta['fingerprints']) - set(fingerprints):
+        if os.path.exists(_date_path(table_name, day)):
+            os.remove(_date_path(table_name, day))
+
+    meta['fingerprints'] = fingerprints
+    meta['watermark'] = max(fingerprints) if fingerprints else None
+    _write(_meta_path(table_name), lambda path: save_meta(path, meta))
+    print(f"Synced {rows['Date'].nunique()} dates ({len(rows)} rows) of {table_name} into the feature cache")
+    return True
+
+def load(table_name, columns=None, start_date=None, end_date=None):
+    """Reads some columns of a table over a range of dates from the cache, syncing it once per process first
+
+    Returns None for tables the cache does not hold (those without a Date column).
+    """
+    if table_name not in _synced:
+        _synced[table_name] = sync(table_name)
+    if not _synced[table_name]:
+        return None
+
+    meta = load_meta(table_name)
+    columns = columns or meta['columns']
+    days = [day for day in sorted(meta['fingerprints'])
+            if (start_date is None or day >= start_date.strftime('%Y-%m-%d'))
+            and (end_date is None or day <= end_date.strftime('%Y-%m-%d'))]
+    if not days:
+        return pd.DataFrame(columns=columns)
+    return pd.concat([pd.read_parquet(_date_path(table_name, day), columns=columns) for day in days],
+                     ignore_index=True)
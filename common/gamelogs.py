@@ -0,0 +1,164 @@
+"""Per-game player and team lines from PlayerGameLogs / TeamGameLogs, ingested once into MySQL"""
+from datetime import date, timedelta
+
+import pandas as pd
+from nba_api.stats.endpoints import LeagueDashPlayerStats, PlayerGameLogs, TeamGameLogs
+
+from common import dimensions, names, nba_client, schema, telemetry
+from common.db import connect_to_sql
+from common.leaguedash import export_data_to_sql
+
+# Counting stats kept for every game (PlayerGameLogs also has fantasy points and double/triple doubles)
+TEAM_STATS = ['MIN', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK',
+              'BLKA', 'PF', 'PFD', 'PTS', 'PLUS_MINUS']
+PLAYER_STATS = TEAM_STATS + ['NBA_FANTASY_PTS', 'DD2', 'TD3']
+
+# Every game counts for the box scores; the rolling LeagueDash-style tables only use the regular season
+SEASON_TYPES = ['Regular Season', 'PlayIn', 'Playoffs']
+
+# Game log tables: the endpoint that fills each one, its NBA IDs (the first one keys the rows) and its columns
+GAME_LOGS = {
+    'player_game_log': {
+        'endpoint': PlayerGameLogs,
+        'id_columns': ['PLAYER_ID', 'TEAM_ID'],
+        'labels': ['Team', 'Player', 'MATCHUP'],
+        'stats': PLAYER_STATS
+    },
+    'team_game_log': {
+        'endpoint': TeamGameLogs,
+        'id_columns': ['TEAM_ID'],
+        'labels': ['Team', 'MATCHUP'],
+        'stats': TEAM_STATS
+    },
+}
+
+def get_season(day):
+    """Returns the NBA season (e.g. 2024-25) a date belongs to"""
+    start_year = day.year if day.month >= 8 else day.year - 1
+    return f"{start_year}-{str(start_year + 1)[2:]}"
+
+def get_columns(table_name):
+    """Returns the columns stored in a game log table"""
+    game_log = GAME_LOGS[table_name]
+    return (['GAME_ID', 'Date', 'SEASON_TYPE'] + game_log['id_columns'] + game_log['labels'] + ['W']
+            + game_log['stats'])
+
+def create_table(cursor, conn, table_name):
+    """Creates a new table if it does not exist in the MySQL database"""
+    game_log = GAME_LOGS[table_name]
+    id_columns = [f'{column} INT' for column in game_log['id_columns']]
+    label_columns = [f'{label} varchar(255)' for label in game_log['labels']]
+    stat_columns = [f'`{column}` FLOAT' for column in ['W'] + game_log['stats']]
+    create_table_query = f'''
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        GAME_ID varchar(20),
+        `Date` DATE,
+        SEASON_TYPE varchar(20),
+        {', '.join(id_columns + label_columns + stat_columns)}
+    )
+    '''
+    cursor.execute(create_table_query)
+    migrate(cursor, table_name)
+    # One row per game and player (or team); game days are read by date range
+    schema.ensure_keys(cursor, table_name, ['GAME_ID', game_log['id_columns'][0]], indexes=[['Date']])
+    dimensions.add_id_columns(cursor, conn, table_name, {'TEAM_ID': 'Team'})
+
+def migrate(cursor, table_name):
+    """Adds SEASON_TYPE and MATCHUP to tables created before they were stored
+
+    Those tables only hold regular season games and their MATCHUP cannot be rebuilt, so their rows are cleared and
+    the next ingest fetches the span again with every season type.
+    """
+    cursor.execute('''
+    SELECT COLUMN_NAME
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    ''', (table_name,))
+    existing = set(row[0] for row in cursor.fetchall())
+    missing = [column for column in ('SEASON_TYPE', 'MATCHUP') if column not in existing]
+    if not missing:
+        return
+    column_types = {'SEASON_TYPE': 'varchar(20)', 'MATCHUP': 'varchar(255)'}
+    cursor.execute(f"ALTER TABLE {table_name} "
+                   + ', '.join(f"ADD COLUMN {column} {column_types[column]}" for column in missing))
+    cursor.execute(f"DELETE FROM {table_name}")
+    print(f"Added {', '.join(missing)} to {table_name}; its {cursor.rowcount} rows will be ingested again")
+
+def scrape_data(table_name, start_date, end_date):
+    """Fetches every game played between two dates (one request per season and season type touched)"""
+    game_log = GAME_LOGS[table_name]
+    dataframes = []
+    season_start = start_date
+    while season_start <= end_date:
+        season = get_season(season_start)
+        season_end = min(end_date, date(int(season[:4]) + 1, 7, 31))
+        for season_type in SEASON_TYPES:
+            params = {
+                "season_nullable": season,
+                "season_type_nullable": season_type,
+                "date_from_nullable": season_start.strftime('%m/%d/%Y'),
+                "date_to_nullable": season_end.strftime('%m/%d/%Y')
+            }
+            response = nba_client.fetch(game_log['endpoint'], **params, timeout=30)
+            df = response.get_data_frames()[0]
+            df['SEASON_TYPE'] = season_type
+            dataframes.append(df)
+        season_start = season_end + timedelta(days=1)
+
+    df = pd.concat(dataframes, ignore_index=True)
+    df['Date'] = pd.to_datetime(df['GAME_DATE']).dt.date
+    df['W'] = (df['WL'] == 'W').astype(float)
+    df['Team'] = df['TEAM_ABBREVIATION']
+    if 'Player' in game_log['labels']:
+        # Remove inconsistent formatting from player names
+        df['Player'] = names.normalize(df['PLAYER_NAME'])
+
+    # Fill NaN values with 0
+    return df[get_columns(table_name)].fillna(0)
+
+def ingest(table_name, start_date, end_date):
+    """Makes sure every game between two dates is in the game log table, fetching only days not ingested yet"""
+    with connect_to_sql() as (cursor, conn):
+        create_table(cursor, conn, table_name)
+        conn.commit()  # Keep a migration's cleared rows cleared
+        cursor.execute(f"SELECT MIN(Date), MAX(Date) FROM {table_name}")
+        first_ingested, last_ingested = cursor.fetchone()
+
+    # The ingested days are always one contiguous span, extended at either end
+    if first_ingested is None:
+        ranges = [(start_date, end_date)]
+    else:
+        ranges = [(start_date, min(end_date, first_ingested - timedelta(days=1))),
+                  (max(start_date, last_ingested + timedelta(days=1)), end_date)]
+
+    for range_start, range_end in ranges:
+        if range_start > range_end:
+            continue
+        df = scrape_data(table_name, range_start, range_end)
+        telemetry.emit('rows_parsed', table=table_name, rows=len(df))
+        if not df.empty:
+            export_data_to_sql(df, table_name)
+        print(f"Ingested {len(df)} {table_name} rows from {range_start} to {range_end}")
+
+def load(table_name, start_date, end_date, season_type=None):
+    """Loads the game log rows played between two dates (optionally of one season type only)"""
+    columns = get_columns(table_name)
+    query = f'''
+    SELECT {', '.join(f'`{column}`' for column in columns)}
+    FROM {table_name}
+    WHERE `Date` BETWEEN %s AND %s
+    '''
+    params = [start_date, end_date]
+    if season_type:
+        query += "AND SEASON_TYPE = %s"
+        params.append(season_type)
+    with connect_to_sql() as (cursor, conn):
+        cursor.execute(query, params)
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+def get_ages(season):
+    """Returns each player's age for a season from a single season-level request"""
+    response = nba_client.fetch(LeagueDashPlayerStats, season=season, per_mode_detailed='PerGame', timeout=10)
+    df = response.get_data_frames()[0]
+    return dict(zip(df['PLAYER_ID'], df['AGE']))
@@ -0,0 +1,41 @@
+"""Checkpoint journal that keeps each fetched date window on disk until it is exported"""
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from common import config
+
+class ScrapeJournal:
+    """Per-scraper journal of completed date windows, so a rerun resumes where the last one stopped"""
+
+    def __init__(self, name):
+        # One directory per scraper (and per variant, e.g. playtype)
+        slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+        self.directory = os.path.join(config.SCRAPE_JOURNAL_DIR, slug)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, end_date):
+        """Returns the journal file for a window ending on `end_date` (MM/DD/YYYY)"""
+        window_end = datetime.strptime(end_date, '%m/%d/%Y').strftime('%Y-%m-%d')
+        return os.path.join(self.directory, f"{window_end}.pkl")
+
+    def has(self, end_date):
+        """Checks if the window ending on `end_date` was already fetched"""
+        return os.path.exists(self._path(end_date))
+
+    def save(self, end_date, df):
+        """Persists a fetched window, writing to a temp file first so a crash never leaves half a file"""
+        path = self._path(end_date)
+        df.to_pickle(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def load_window(self, end_date):
+        """Loads the journaled window ending on `end_date`"""
+        return pd.read_pickle(self._path(end_date))
+
+    def discard(self, end_date):
+        """Removes a window once its rows are committed to MySQL"""
+        if self.has(end_date):
+            os.remove(self._path(end_date))
@@ -0,0 +1,166 @@
+"""Declarative engine for the LeagueDash scrapers: one spec per dataset, one implementation of everything else"""
+from datetime import datetime, timedelta
+from functools import reduce
+
+import pandas as pd
+
+from common import dimensions, ledger, names, nba_client, pipeline, schema, telemetry
+from common.db import connect_to_sql, insert_batches
+
+# Length of the rolling window each target date is scraped for
+LAST_X_DAYS = 14
+
+# Mapping for team names
+TEAM_ABBREVIATIONS = {
+    'Utah Jazz': 'UTA', 'Chicago Bulls': 'CHI', 'Phoenix Suns': 'PHX',
+    'Golden State Warriors': 'GSW', 'Charlotte Hornets': 'CHA', 'Miami Heat': 'MIA',
+    'Memphis Grizzlies': 'MEM', 'Dallas Mavericks': 'DAL', 'New Orleans Pelicans': 'NOP',
+    'Oklahoma City Thunder': 'OKC', 'Los Angeles Lakers': 'LAL', 'Toronto Raptors': 'TOR',
+    'Atlanta Hawks': 'ATL', 'Milwaukee Bucks': 'MIL', 'Washington Wizards': 'WAS',
+    'Sacramento Kings': 'SAC', 'Detroit Pistons': 'DET', 'Philadelphia 76ers': 'PHI',
+    'New York Knicks': 'NYK', 'LA Clippers': 'LAC', 'Cleveland Cavaliers': 'CLE',
+    'Houston Rockets': 'HOU', 'Boston Celtics': 'BOS', 'Brooklyn Nets': 'BKN',
+    'Denver Nuggets': 'DEN', 'Orlando Magic': 'ORL', 'Portland Trail Blazers': 'POR',
+    'Indiana Pacers': 'IND', 'San Antonio Spurs': 'SAS', 'Minnesota Timberwolves': 'MIN'
+}
+
+class DatasetSpec:
+    """Everything that differs between LeagueDash datasets: endpoint, params, column mapping and table"""
+
+    def __init__(self, table, label, endpoint, params, columns, team_column, mapping=None, variants=None,
+                 player_column=None, team_id_column='TEAM_ID'):
+        self.table = table
+        self.label = label  # Used in progress messages
+        self.endpoint = endpoint
+        self.params = params
+        self.columns = columns  # Stat columns stored in the table (all FLOAT)
+        self.team_column = team_column  # API column holding the team (TEAM_NAME is mapped to an abbreviation)
+        self.player_column = player_column  # API column holding the player name, None for team datasets
+        self.team_id_column = team_id_column  # API column holding the team's NBA ID (players also have PLAYER_ID)
+        # Each variant is one request per window (e.g. one per playtype); their frames are merged on the key
+        self.variants = variants or [{'params': {}, 'mapping': mapping or {}}]
+
+    @property
+    def key(self):
+        """Columns that identify a row"""
+        return ['Date', 'Team', 'Player'] if self.player_column else ['Date', 'Team']
+
+    @property
+    def id_columns(self):
+        """NBA IDs stored next to the key, which the models join on"""
+        return ['TEAM_ID', 'PLAYER_ID'] if self.player_column else ['TEAM_ID']
+
+def create_table(cursor, conn, spec):
+    """Creates a new table if it does not exist in the MySQL database"""
+    key_columns = ['`Date` DATE', 'Team varchar(255)'] + (['Player varchar(255)'] if spec.player_column else [])
+    key_columns += [f'{column} INT' for column in spec.id_columns]
+    stat_columns = [f'`{column}` FLOAT' for column in spec.columns]
+    create_table_query = f'''
+    CREATE TABLE IF NOT EXISTS {spec.table} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        {', '.join(key_columns + stat_columns)}
+    )
+    '''
+    cursor.execute(create_table_query)
+    schema.ensure_keys(cursor, spec.table, spec.key)
+    # Tables created before the IDs were stored get them from the names of their rows
+    dimensions.add_id_columns(cursor, conn, spec.table, {'TEAM_ID': 'Team'},
+                              {'PLAYER_ID': 'Player'} if spec.player_column else None)
+
+def export_data_to_sql(data, table_name):
+    """Exports the data to the MySQL database, matching DataFrame columns to table columns by name"""
+    insert_query = schema.get_upsert_query(table_name, data.columns)
+    rows = list(data.itertuples(index=False, name=None))
+    with telemetry.timed('db_write', table=table_name, rows=len(rows)), connect_to_sql() as (cursor, conn):
+        if 'PLAYER_ID' in data.columns:
+            dimensions.register_players(cursor, conn, data)
+        insert_batches(cursor, conn, insert_query, rows)
+
+def get_date_range(dates_to_scrape, last_x_days):
+    # Create a tuple of start and end dates for a X day window
+    date_range = []
+    for date in dates_to_scrape:
+        start_date = (date - timedelta(days=last_x_days)).strftime('%m/%d/%Y')
+        date_range.append((start_date, date.strftime('%m/%d/%Y')))
+
+    return date_range
+
+def rename_column(col_name, mapping):
+    # For each original label in mapping, replace it with the short label
+    for original, short_label in mapping.items():
+        if original in col_name:
+            col_name = col_name.replace(original, short_label)
+    return col_name
+
+def parse_data(spec, df, mapping, formatted_date):
+    """Turns one endpoint response into the table's key and stat columns"""
+    # Flatten the MultiIndex (shot location endpoints)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ['_'.join(str(x) for x in col if x) for col in df.columns]
+
+    # Build the key columns
+    parsed_df = pd.DataFrame(index=df.index)
+    parsed_df['Date'] = formatted_date
+    if spec.team_column == 'TEAM_NAME':
+        parsed_df['Team'] = df['TEAM_NAME'].map(TEAM_ABBREVIATIONS)
+    else:
+        parsed_df['Team'] = df[spec.team_column]
+    parsed_df['TEAM_ID'] = df[spec.team_id_column]
+    if spec.player_column:
+        # Remove inconsistent formatting from player names
+        parsed_df['Player'] = names.normalize(df[spec.player_column])
+        parsed_df['PLAYER_ID'] = df['PLAYER_ID']
+
+    # Rename the stat columns and keep the ones the table stores
+    df.columns = [rename_column(c, mapping) for c in df.columns]
+    stat_columns = [column for column in spec.columns if column in df.columns]
+    parsed_df = pd.concat([parsed_df, df[stat_columns]], axis=1)
+
+    # Fill NaN values with 0
+    return parsed_df.fillna(0)
+
+def scrape_data(spec, start_date, end_date):
+    """Fetches every variant of a dataset for one window and merges them into one frame"""
+    formatted_date = datetime.strptime(end_date, '%m/%d/%Y').strftime('%Y-%m-%d')
+    dataframes = []
+    for variant in spec.variants:
+        # Define the parameters for the API
+        params = {
+            **spec.params,
+            **variant['params'],
+            "date_from_nullable": start_date,
+            "date_to_nullable": end_date
+        }
+        # Get the data from the API
+        try:
+            response = nba_client.fetch(spec.endpoint, **params, timeout=10)
+        except Exception as e:
+            print("An error occurred:", e)
+            return None
+
+        # Parse the data
+        dataframes.append(parse_data(spec, response.get_data_frames()[0], variant['mapping'], formatted_date))
+
+    print(f"Scraped {spec.label} data for {formatted_date}")
+    return reduce(lambda left, right: pd.merge(left, right, on=spec.key + spec.id_columns, how='inner'),
+                  dataframes)
+
+def run_dataset(spec, context):
+    """Scrapes every missing window of a dataset and streams it into its table"""
+    # Define the number of days to scrape
+    target_date = context.target_date
+    days_to_scrape = (target_date - context.season_start).days
+    with connect_to_sql() as (cursor, conn):
+        create_table(cursor, conn, spec)
+        ledger.seed(cursor, spec.table, spec.table)
+        conn.commit()
+        dates_to_scrape = ledger.get_dates_to_scrape(cursor, spec.table, target_date, days_to_scrape)
+    if not dates_to_scrape:
+        print("No new data to scrape.")
+        return
+
+    # Stream each window to MySQL as soon as it is fetched
+    date_range = get_date_range(dates_to_scrape, LAST_X_DAYS)
+    fetch_window = lambda start_date, end_date: scrape_data(spec, start_date, end_date)
+    rows = pipeline.scrape_to_sql(fetch_window, date_range, spec.table, export_data_to_sql)
+    print(f"Exported {rows} rows to {spec.table}")
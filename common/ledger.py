@@ -0,0 +1,115 @@
+"""Shared scrape ledger: one row per dataset and window end, so gap detection is an indexed lookup"""
+import hashlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from common.db import connect_to_sql
+
+TABLE_NAME = 'scrape_ledger'
+
+# Window statuses that count as scraped ('empty' means the source had nothing for that window, e.g. an off day)
+DONE = 'done'
+EMPTY = 'empty'
+
+def create_table(cursor):
+    """Creates the ledger if it does not exist in the MySQL database"""
+    create_table_query = f'''
+    CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+        dataset varchar(64) NOT NULL,
+        window_end DATE NOT NULL,
+        status varchar(16) NOT NULL,
+        row_count INT NOT NULL,
+        fetched_at DATETIME NOT NULL,
+        checksum CHAR(64),
+        PRIMARY KEY (dataset, window_end)
+    )
+    '''
+    cursor.execute(create_table_query)
+
+def seed(cursor, dataset, table_name, empty_condition=None):
+    """Fills the ledger for a dataset from the dates already in its table, the first time the dataset is seen
+
+    `empty_condition` matches placeholder rows that only mark a window as empty; they are recorded as empty
+    windows and deleted from the data table.
+    """
+    create_table(cursor)
+    if is_seeded(cursor, dataset):
+        return
+
+    real_rows = f"NOT ({empty_condition})" if empty_condition else "TRUE"
+    seed_query = f'''
+    INSERT INTO {TABLE_NAME} (dataset, window_end, status, row_count, fetched_at)
+    SELECT %s, `Date`, IF(SUM({real_rows}) > 0, %s, %s), SUM({real_rows}), NOW()
+    FROM {table_name}
+    GROUP BY `Date`
+    '''
+    cursor.execute(seed_query, (dataset, DONE, EMPTY))
+    if empty_condition:
+        cursor.execute(f"DELETE FROM {table_name} WHERE {empty_condition}")
+
+def is_seeded(cursor, dataset):
+    """Checks if the ledger has any entry for a dataset (the ledger table must exist)"""
+    cursor.execute(f"SELECT 1 FROM {TABLE_NAME} WHERE dataset = %s LIMIT 1", (dataset,))
+    return bool(cursor.fetchall())
+
+def get_missing_dates(target_date, days_to_scrape, dates_scraped):
+    """Returns the dates in the lookback range that are not in `dates_scraped`, newest first"""
+    date_range = [
+        (target_date - timedelta(days=i))
+        for i in range(days_to_scrape + 1)
+    ]
+    return sorted(set(date_range) - set(dates_scraped))[::-1]
+
+def get_dates_to_scrape(cursor, dataset, target_date, days_to_scrape):
+    """Returns the dates in the lookback range with no finished ledger entry, newest first"""
+    query = f'''
+    SELECT window_end
+    FROM {TABLE_NAME}
+    WHERE dataset = %s AND window_end BETWEEN %s AND %s AND status IN (%s, %s)
+    '''
+    cursor.execute(query, (dataset, target_date - timedelta(days=days_to_scrape), target_date, DONE, EMPTY))
+    dates_scraped = set(row[0] for row in cursor.fetchall())
+    return get_missing_dates(target_date, days_to_scrape, dates_scraped)
+
+def get_checksum(df):
+    """Fingerprint of a window's rows, to spot windows whose data changed between fetches"""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+def record(dataset, windows):
+    """Marks windows as scraped: `windows` is a list of (window_end, DataFrame or row count)"""
+    if not windows:
+        return
+    rows = []
+    for window_end, data in windows:
+        if isinstance(window_end, str):
+            window_end = datetime.strptime(window_end, '%m/%d/%Y').date()
+        row_count = data if isinstance(data, int) else len(data)
+        checksum = None if isinstance(data, int) else get_checksum(data)
+        rows.append((dataset, window_end, DONE if row_count else EMPTY, row_count, checksum))
+
+    insert_query = f'''
+    INSERT INTO {TABLE_NAME} (dataset, window_end, status, row_count, fetched_at, checksum)
+    VALUES (%s, %s, %s, %s, NOW(), %s)
+    ON DUPLICATE KEY UPDATE status = VALUES(status), row_count = VALUES(row_count),
+        fetched_at = VALUES(fetched_at), checksum = VALUES(checksum)
+    '''
+    with connect_to_sql() as (cursor, conn):
+        create_table(cursor)
+        cursor.executemany(insert_query, rows)
+        conn.commit()
+
+def record_from_table(dataset, table_name, dates):
+    """Marks dates as scraped, counting their rows in the data table (for tables written outside the pipeline)"""
+    if not dates:
+        return
+    with connect_to_sql() as (cursor, conn):
+        query = f'''
+        SELECT `Date`, COUNT(*)
+        FROM {table_name}
+        WHERE `Date` IN ({', '.join(['%s'] * len(dates))})
+        GROUP BY `Date`
+        '''
+        cursor.execute(query, list(dates))
+        row_counts = dict(cursor.fetchall())
+    record(dataset, [(day, row_counts.get(day, 0)) for day in dates])
@@ -0,0 +1,111 @@
+"""Model inputs: the feature lists and a query builder that reads only the columns and dates the models use"""
+from datetime import timedelta
+
+import pandas as pd
+
+from common import feature_cache
+from common.db import connect_to_sql, read_frame
+
+# Feature sets shared by train_model.py and test_model.py
+PLAYTYPE = ['2FGA_cns', '3PA_cns', '2FGA_pullup', '3PA_pullup']
+ZONE = ['RA_FGA', 'Mid_FGA', 'LC3_FGA', 'RC3_FGA', 'C3_FGA', 'AB3_FGA']
+MISC = ['PTS_OFF_TOV', 'PTS_2ND_CHANCE', 'PTS_FB', 'PTS_PAINT']
+TRADITIONAL = ['AGE', 'W_PCT', 'MIN', 'FGA', '3PA', 'FTA', 'FG_PCT', '3P_PCT']
+OPP_PLAYTYPE = ['Opp_2FGA_cns', 'Opp_3PA_cns', 'Opp_2FGA_pullup', 'Opp_3PA_pullup']
+OPP_ZONE = ['Opp_RA_FGA', 'Opp_Mid_FGA', 'Opp_LC3_FGA', 'Opp_RC3_FGA', 'Opp_C3_FGA', 'Opp_AB3_FGA']
+OPP_MISC = ['OPP_PTS_OFF_TOV', 'OPP_PTS_2ND_CHANCE', 'OPP_PTS_FB', 'OPP_PTS_PAINT']
+OPP_TRADITIONAL = ['OPP_FGM', 'OPP_FGA', 'OPP_3PA', 'OPP_FTA', 'OPP_FG_PCT', 'OPP_3P_PCT']
+# Team totals of the players ruled out that day (summed by process_injury_data)
+INJURY = [f'{feature}_unknown' for feature in PLAYTYPE + ZONE + MISC]
+CONTEXT = ['Is_Back_To_Back', 'Home_Court_Advantage']
+
+FEATURES = (PLAYTYPE + ZONE + MISC + TRADITIONAL + OPP_PLAYTYPE + OPP_ZONE + OPP_MISC + OPP_TRADITIONAL + INJURY
+            + CONTEXT)
+LABEL = 'Points'
+
+# Columns each table contributes besides its key (PPG is compared against the projections)
+PLAYER_TABLES = {
+    'player_playtype': PLAYTYPE,
+    'player_misc': MISC,
+    'player_shot_locations': ZONE,
+    'player_traditional': TRADITIONAL + ['PPG'],
+}
+OPP_TABLES = {
+    'opp_playtype': OPP_PLAYTYPE,
+    'opp_misc': OPP_MISC,
+    'opp_shot_locations': OPP_ZONE,
+    'opp_traditional': OPP_TRADITIONAL,
+}
+# The tables are joined on NBA IDs, resolved from names when the rows were scraped (common/dimensions.py)
+PLAYER_KEY = ['Date', 'TEAM_ID', 'PLAYER_ID']
+OPP_KEY = ['Date', 'TEAM_ID']
+
+# Rows whose names did not resolve to an ID cannot be joined, so they are dropped (and counted) when loaded
+ID_COLUMNS = ['TEAM_ID', 'PLAYER_ID', 'OPP_TEAM_ID', 'HOME_TEAM_ID', 'AWAY_TEAM_ID']
+
+# Team and player name columns (labels only), loaded as categoricals so every row stores a small integer code
+NAME_COLUMNS = ['Team', 'Opp_Team', 'Home_Team', 'Away_Team', 'Player']
+
+class TableQuery:
+    """SELECT of some columns of a table, optionally limited to a range of dates (both ends included)"""
+
+    def __init__(self, table, columns=None, start_date=None, end_date=None):
+        self.table = table
+        self.columns = columns
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def to_sql(self, count=False):
+        """Returns the query (or the query counting its rows) and its parameters"""
+        columns = ', '.join(f'`{column}`' for column in self.columns) if self.columns else '*'
+        if count:
+            columns = 'COUNT(*)'
+        conditions, params = [], []
+        if self.start_date is not None:
+            conditions.append("`Date` >= %s")
+            params.append(self.start_date)
+        if self.end_date is not None:
+            conditions.append("`Date` <= %s")
+            params.append(self.end_date)
+        query = f"SELECT {columns} FROM {self.table}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        return query, params
+
+def load_data_from_sql(table, columns=None, start_date=None, end_date=None):
+    """Loads some columns of a table over a range of dates, from the feature cache if it holds the table, else MySQL"""
+    df = feature_cache.load(table, columns, start_date, end_date) if feature_cache.enabled() else None
+    if df is None:
+        table_query = TableQuery(table, columns, start_date, end_date)
+        with connect_to_sql() as (cursor, conn):
+            # Count first so the columns are allocated once at their final size
+            cursor.execute(*table_query.to_sql(count=True))
+            row_count = cursor.fetchone()[0]
+            cursor.execute(*table_query.to_sql())
+            df = read_frame(cursor, row_count)
+    id_columns = [column for column in ID_COLUMNS if column in df.columns]
+    if id_columns:
+        resolved = df[id_columns].notna().all(axis=1)
+        if not resolved.all():
+            print(f"WARNING: {(~resolved).sum()} rows of {table} have no NBA ID")
+            df = df[resolved].reset_index(drop=True)
+        df = df.astype({column: 'int64' for column in id_columns})
+    for column in NAME_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+def load_feature_tables(tables, key, start_date=None, end_date=None):
+    """Loads each table's key and feature columns for a range of game dates
+
+    A row dated D holds the stats through D, so it describes games on D + 1: the dates are shifted by one day
+    (and the range pushed into SQL one day earlier).
+    """
+    sql_start = start_date - timedelta(days=1) if start_date is not None else None
+    sql_end = end_date - timedelta(days=1) if end_date is not None else None
+    data = {}
+    for table, columns in tables.items():
+        df = load_data_from_sql(table, key + columns, sql_start, sql_end)
+        df['Date'] = df['Date'] + pd.Timedelta(days=1) # Shift the date by 1 day
+        data[table] = df
+    return data
@@ -0,0 +1,80 @@
+"""Player name normalization shared by every scraper: vectorized over distinct names and memoized on disk
+
+Sources differ in ' Jr.' suffixes and diacritics (Luka Dončić vs Luka Doncic). A season of rows holds only a few
+hundred distinct names, so each one is normalized once with pandas string ops, and the raw -> normalized pairs are
+kept in a JSON memo that later runs start from.
+"""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from common import config
+
+# Unicode combining mark blocks, what NFD splits accents into
+COMBINING_MARKS = '[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]'
+
+# Version of the normalization rules in clean(); bump it whenever they change so memos saved under the old rules
+# are discarded instead of serving stale names
+RULES_VERSION = 1
+
+_memo = None
+_lock = threading.Lock()
+
+def load_memo():
+    """Returns the raw -> normalized memo, read from disk on first use (memos of other rule versions start over)"""
+    global _memo
+    if _memo is None:
+        _memo = {}
+        if config.NAME_MEMO_PATH:
+            try:
+                with open(config.NAME_MEMO_PATH) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = None
+            if isinstance(saved, dict) and saved.get('version') == RULES_VERSION:
+                _memo = saved['names']
+            elif saved is not None:
+                print("Discarding the name memo saved under other normalization rules")
+    return _memo
+
+def save_memo():
+    """Writes the memo to a temp file first so a crash never leaves half a file
+
+    The temp file is per process because scrapers run as separate processes can save at once. A failed save only
+    costs the next run some cleaning, so it is reported and never fails the scrape.
+    """
+    if not config.NAME_MEMO_PATH:
+        return
+    tmp_path = f"{config.NAME_MEMO_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': RULES_VERSION, 'names': _memo}, f, ensure_ascii=False)
+        os.replace(tmp_path, config.NAME_MEMO_PATH)
+    except OSError as e:
+        print(f"Could not save the name memo: {e}")
+
+def clean(names):
+    """Strips ' Jr.' and diacritics from a Series of names with vectorized string ops"""
+    return (names.str.replace(' Jr.', '', regex=False)
+            .str.normalize('NFD')
+            .str.replace(COMBINING_MARKS, '', regex=True)
+            .str.strip())
+
+def normalize(names):
+    """Normalizes a column of names, cleaning only the distinct names the memo does not know yet"""
+    names = pd.Series(names, dtype=object)
+    unique = pd.unique(names.dropna())
+    with _lock:
+        memo = load_memo()
+        new = [name for name in unique if name not in memo]
+        if new:
+            memo.update(zip(new, clean(pd.Series(new, dtype=object))))
+            save_memo()
+        mapping = {name: memo[name] for name in unique}
+    return names.map(mapping)
+
+def normalize_name(name):
+    """Normalizes a single name through the memo"""
+    return normalize([name]).iloc[0]
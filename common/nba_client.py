@@ -0,0 +1,85 @@
+"""Single entry point for stats.nba.com requests: coalescing, response caching, rate limiting, retries and telemetry"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from common import config, rate_limiter, response_cache, telemetry
+
+# Request broker: identical requests made while one is in flight (or shortly after) share its response
+_broker_lock = threading.Lock()
+_in_flight = {}  # request key -> Future of the endpoint
+_recent = OrderedDict()  # request key -> endpoint, most recently used last
+
+def request_key(endpoint_cls, params):
+    """Identifies a request by its endpoint and normalized params (transport options such as timeout are ignored)"""
+    normalized = tuple(sorted((name, str(value)) for name, value in params.items()
+                              if name != 'timeout' and value is not None))
+    return endpoint_cls.__name__, normalized
+
+def _request(endpoint_cls, **params):
+    """Requests an nba_api endpoint under the shared rate limit, retrying failed attempts"""
+    attempt = 0
+    while True:
+        rate_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            endpoint = endpoint_cls(**params)
+        except Exception as e:
+            telemetry.emit('api_call', endpoint=endpoint_cls.__name__, seconds=round(time.perf_counter() - start, 4),
+                           attempt=attempt, ok=False, error=type(e).__name__)
+            if attempt >= config.NBA_API_RETRIES:
+                raise
+            attempt += 1
+            time.sleep(2 ** attempt)  # Back off before trying again
+            continue
+        telemetry.emit('api_call', endpoint=endpoint_cls.__name__, seconds=round(time.perf_counter() - start, 4),
+                       attempt=attempt, ok=True)
+        return endpoint
+
+def _cached_request(endpoint_cls, key, params, as_of):
+    """Serves a request from the on-disk response cache, fetching and storing it on a miss"""
+    response = response_cache.load(key)
+    if response is not None:
+        telemetry.emit('api_cache_hit', endpoint=endpoint_cls.__name__)
+        return response_cache.rebuild(endpoint_cls, params, response)
+    endpoint = _request(endpoint_cls, **params)
+    response_cache.save(key, endpoint.nba_response.get_response(), response_cache.get_expiry(params, as_of))
+    return endpoint
+
+def fetch(endpoint_cls, as_of=None, **params):
+    """Requests an nba_api endpoint, sharing the response with every scraper that asks for the same thing
+
+    `as_of` is the last day the response covers, for endpoints whose params do not say (e.g. a box score's game
+    date). Responses covering days before yesterday are cached on disk for good.
+    """
+    key = request_key(endpoint_cls, params)
+    with _broker_lock:
+        if key in _recent:
+            _recent.move_to_end(key)
+            telemetry.emit('api_coalesced', endpoint=endpoint_cls.__name__)
+            return _recent[key]
+        future = _in_flight.get(key)
+        owner = future is None
+        if owner:
+            future = _in_flight[key] = Future()
+
+    if not owner:
+        # Another scraper is already fetching this: wait for its response (or its error)
+        telemetry.emit('api_coalesced', endpoint=endpoint_cls.__name__)
+        return future.result()
+
+    try:
+        endpoint = _cached_request(endpoint_cls, key, params, as_of)
+    except Exception as e:
+        with _broker_lock:
+            del _in_flight[key]
+        future.set_exception(e)
+        raise
+    with _broker_lock:
+        del _in_flight[key]
+        _recent[key] = endpoint
+        while len(_recent) > config.NBA_API_RECENT_RESPONSES:
+            _recent.popitem(last=False)
+    future.set_result(endpoint)
+    return endpoint
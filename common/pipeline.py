@@ -0,0 +1,95 @@
+"""Streaming scrape-to-MySQL pipeline: windows flow through a bounded queue to a batching writer"""
+import contextvars
+import queue
+import threading
+
+import pandas as pd
+
+from common import async_fetch, config, ledger, telemetry
+from common.journal import ScrapeJournal
+
+_DONE = object()
+
+def _fetch_in_background(fetch_window, windows):
+    """Yields (window, frame) pairs fetched by a background thread, which pauses while the queue is full"""
+    results = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+    stopped = threading.Event()
+    errors = []
+
+    def fetch_unless_stopped(*window):
+        # Windows still queued when the consumer stops are not fetched
+        return None if stopped.is_set() else fetch_window(*window)
+
+    def put_result(window, result):
+        if not stopped.is_set():
+            results.put((window, result))
+
+    def produce():
+        try:
+            async_fetch.fetch_windows(fetch_unless_stopped, windows, put_result)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            results.put(_DONE)
+
+    # Copy the context so telemetry from the fetch thread is tagged with this scraper
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(produce,), daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        # Unblock the producer if the writer stopped early
+        stopped.set()
+        while thread.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    if errors:
+        raise errors[0]
+
+def stream_windows(fetch_window, windows, journal, table_name):
+    """Yields (end_date, frame) for each window: first any left in the journal by an interrupted run, then new ones as they arrive"""
+    pending = []
+    for window in windows:
+        end_date = window[1]
+        if journal.has(end_date):
+            yield end_date, journal.load_window(end_date)
+        else:
+            pending.append(window)
+
+    for window, window_df in _fetch_in_background(fetch_window, pending):
+        if window_df is None:
+            continue
+        end_date = window[1]
+        telemetry.emit('rows_parsed', table=table_name, window_end=end_date, rows=len(window_df))
+        journal.save(end_date, window_df)
+        yield end_date, window_df
+
+def scrape_to_sql(fetch_window, windows, table_name, export_data_to_sql, batch_rows=None):
+    """Streams fetched windows into MySQL in batches while the next windows are still being fetched"""
+    batch_rows = batch_rows or config.PIPELINE_BATCH_ROWS
+    journal = ScrapeJournal(table_name)
+    batch = []
+    total_rows = 0
+
+    def flush():
+        export_data_to_sql(pd.concat([df for _, df in batch], ignore_index=True), table_name)
+        # The rows are committed: mark their windows as scraped, so the journal no longer needs them
+        ledger.record(table_name, batch)
+        for end_date, _ in batch:
+            journal.discard(end_date)
+        batch.clear()
+
+    for end_date, window_df in stream_windows(fetch_window, windows, journal, table_name):
+        batch.append((end_date, window_df))
+        total_rows += len(window_df)
+        if sum(len(df) for _, df in batch) >= batch_rows:
+            flush()
+    if batch:
+        flush()
+    return total_rows
@@ -0,0 +1,96 @@
+"""Backfill planner: the stats.nba.com requests needed to fill every API table over a date range"""
+from nba_api.stats.endpoints import ScoreboardV2
+
+from common import config, gamelogs, leaguedash, ledger, nba_client, response_cache, rolling
+from common.datasets import DATASETS
+from common.db import connect_to_sql
+
+# Box score requests are only known once the scoreboard is fetched; estimate them from a typical game day
+GAMES_PER_DAY = 7
+
+# Backfill order: the model's target first, then the feature tables it leans on most
+PRIORITY = ['player_boxscore', 'player_traditional', 'opp_traditional', 'player_playtype', 'opp_playtype',
+            'player_shot_locations', 'opp_shot_locations', 'player_misc', 'opp_misc']
+
+def is_cached(endpoint_cls, params):
+    """Checks if a request would be served from the on-disk response cache"""
+    return response_cache.load(nba_client.request_key(endpoint_cls, params)) is not None
+
+def get_missing_dates(cursor, tables, table_name, context):
+    """Returns the dates a table is missing without writing anything (planning never creates, migrates or seeds)
+
+    Datasets already in the ledger are looked up there; the others fall back to the dates in their own table, the
+    way the ledger will be seeded when the backfill runs.
+    """
+    days_to_scrape = (context.target_date - context.season_start).days
+    if ledger.TABLE_NAME in tables and ledger.is_seeded(cursor, table_name):
+        return ledger.get_dates_to_scrape(cursor, table_name, context.target_date, days_to_scrape)
+    dates_scraped = set()
+    if table_name in tables:
+        cursor.execute(f"SELECT DISTINCT `Date` FROM {table_name} WHERE `Date` BETWEEN %s AND %s",
+                       (context.season_start, context.target_date))
+        dates_scraped = set(row[0] for row in cursor.fetchall())
+    return ledger.get_missing_dates(context.target_date, days_to_scrape, dates_scraped)
+
+def plan_dataset(cursor, tables, spec, context):
+    """Returns the missing dates of a LeagueDash table and the requests needed to fill them"""
+    dates = get_missing_dates(cursor, tables, spec.table, context)
+    if config.ROLLING_FROM_GAMELOGS and spec.table in rolling.ROLLUPS and dates:
+        # The rollup's game log (and age) requests for every season touched
+        seasons = {gamelogs.get_season(day) for day in dates}
+        return dates, rolling.ROLLUPS[spec.table].requests_per_season * len(seasons), 0
+
+    calls = cached = 0
+    for start_date, end_date in leaguedash.get_date_range(dates, leaguedash.LAST_X_DAYS):
+        for variant in spec.variants:
+            params = {**spec.params, **variant['params'],
+                      "date_from_nullable": start_date, "date_to_nullable": end_date}
+            calls += 1
+            cached += is_cached(spec.endpoint, params)
+    return dates, calls, cached
+
+def plan_boxscores(cursor, tables, context):
+    """Returns the dates missing from player_boxscore and an estimate of the requests needed to fill them"""
+    # Placeholder 'n/a' rows of days without games count as scraped, as they do once the ledger is seeded
+    dates = sorted(get_missing_dates(cursor, tables, 'player_boxscore', context))
+    # Older dates come from the game logs (one request per season type and season), the rest per game:
+    # one scoreboard per date plus one box score per game
+    bulk_dates = [day for day in dates if day < context.target_date] if config.BOXSCORE_BULK_INGEST else []
+    per_game_dates = [day for day in dates if day not in bulk_dates]
+    calls = len(gamelogs.SEASON_TYPES) * len({gamelogs.get_season(day) for day in bulk_dates})
+    calls += len(per_game_dates) * (1 + GAMES_PER_DAY)
+    cached = sum(is_cached(ScoreboardV2, {"game_date": day, "league_id": "00", "day_offset": "0"})
+                 for day in per_game_dates)
+    return dates, calls, cached
+
+def plan_backfill(context):
+    """Plans every API table in priority order: [{'name', 'dates', 'calls', 'cached'}, ...]"""
+    plan = []
+    with connect_to_sql() as (cursor, conn):
+        cursor.execute("SHOW TABLES")
+        tables = set(row[0] for row in cursor.fetchall())
+        for name in PRIORITY:
+            if name == 'player_boxscore':
+                dates, calls, cached = plan_boxscores(cursor, tables, context)
+            else:
+                dates, calls, cached = plan_dataset(cursor, tables, DATASETS[name], context)
+            plan.append({'name': name, 'dates': dates, 'calls': calls, 'cached': cached})
+    return plan
+
+def estimate_seconds(calls):
+    """Time the requests take under the global rate limit (the burst is free, the rest is paced)"""
+    return max(0, calls - config.NBA_API_BURST) / config.NBA_API_RATE
+
+def print_plan(plan, context):
+    """Prints the missing dates, request count and time estimate per table"""
+    print(f"\nBackfill plan for {context.season_start} to {context.target_date} "
+          f"({config.NBA_API_RATE} requests/s, burst {config.NBA_API_BURST}):")
+    print(f"  {'table':<24}{'dates':>7}{'requests':>10}{'cached':>8}{'est time':>10}")
+    for entry in plan:
+        calls = entry['calls'] - entry['cached']
+        print(f"  {entry['name']:<24}{len(entry['dates']):>7}{entry['calls']:>10}{entry['cached']:>8}"
+              f"{estimate_seconds(calls) / 60:>9.1f}m")
+    calls = sum(entry['calls'] for entry in plan)
+    cached = sum(entry['cached'] for entry in plan)
+    print(f"  {'total':<24}{sum(len(entry['dates']) for entry in plan):>7}{calls:>10}{cached:>8}"
+          f"{estimate_seconds(calls - cached) / 60:>9.1f}m")
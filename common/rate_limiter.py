@@ -0,0 +1,53 @@
+"""Token bucket rate limiter shared across processes through a locked state file"""
+import fcntl
+import json
+import os
+import time
+
+from common import config
+
+class TokenBucket:
+    """Token bucket whose state lives in a file so every process draws from the same budget"""
+
+    def __init__(self, path, rate, burst):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+
+    def _reserve(self):
+        """Takes a token from the shared bucket and returns how long to wait before using it"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            # Hold an exclusive lock while reading and updating the bucket
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                state = json.loads(os.read(fd, 1024) or b'{}')
+                tokens = state['tokens'] + (now - state['updated']) * self.rate
+            except (ValueError, KeyError):
+                tokens = self.burst
+
+            # Reserve a token, going into debt if the bucket is empty
+            tokens = min(tokens, self.burst) - 1
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({'tokens': tokens, 'updated': now}).encode())
+        finally:
+            os.close(fd)  # Closing the file releases the lock
+
+        # Debt is paid back at `rate` tokens per second
+        return max(0.0, -tokens / self.rate)
+
+    def acquire(self):
+        """Blocks until this caller is allowed to make one request"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+# Budget for every stats.nba.com request made by the scrapers
+nba_api_limiter = TokenBucket(config.NBA_API_RATE_LIMIT_FILE, config.NBA_API_RATE, config.NBA_API_BURST)
+
+def acquire():
+    """Waits for a slot in the global stats.nba.com request budget"""
+    nba_api_limiter.acquire()
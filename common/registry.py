@@ -0,0 +1,50 @@
+"""Registry of every scraper entry point and the tables it depends on"""
+import importlib.util
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each entry maps a node name to the script that defines `run(context)` and the nodes it depends on
+SCRAPERS = {
+    'player_boxscore': {'path': 'scrapers-gamelog/scrape_boxscores.py', 'deps': []},
+    'dk_props': {'path': 'scrapers-misc/scrape_dk_props.py', 'deps': []},
+    'nba_matchups': {'path': 'scrapers-misc/scrape_games.py', 'deps': []},
+    'injury_report': {'path': 'scrapers-injuries/scrape_injuries.py', 'deps': []},
+    'opp_traditional': {'path': 'scrapers-team-api/scrape_traditional_team.py', 'deps': []},
+    'opp_misc': {'path': 'scrapers-team-api/scrape_misc_team.py', 'deps': []},
+    'opp_playtype': {'path': 'scrapers-team-api/scrape_playtype_team.py', 'deps': []},
+    'opp_shot_locations': {'path': 'scrapers-team-api/scrape_zone_team.py', 'deps': []},
+    'player_misc': {'path': 'scrapers-player-api/scrape_misc_player.py', 'deps': []},
+    'player_playtype': {'path': 'scrapers-player-api/scrape_playtype_player.py', 'deps': []},
+    'player_traditional': {'path': 'scrapers-player-api/scrape_traditional_player.py', 'deps': []},
+    'player_shot_locations': {'path': 'scrapers-player-api/scrape_zone_player.py', 'deps': []},
+    # player_injuries is derived from player_boxscore and player_traditional
+    'player_injuries': {
+        'path': 'scrapers-injuries/parse_past_injuries.py',
+        'deps': ['player_boxscore', 'player_traditional']
+    },
+}
+
+# The projections need every table to be refreshed first
+SCRAPERS['projections'] = {'path': 'test_model.py', 'deps': list(SCRAPERS)}
+
+_loaded = {}
+
+def get_script_path(name):
+    """Returns the absolute path of a registered script"""
+    return os.path.join(ROOT_DIR, SCRAPERS[name]['path'])
+
+def load_module(name):
+    """Imports a registered script once and returns the module"""
+    if name not in _loaded:
+        path = get_script_path(name)
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded[name] = module
+    return _loaded[name]
+
+def load_entry_point(name):
+    """Imports a registered script once and returns its `run(context)` function"""
+    return load_module(name).run
@@ -0,0 +1,71 @@
+"""Content-addressed on-disk cache of raw stats.nba.com responses, so finished windows are only fetched once"""
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from nba_api.stats.library.http import NBAStatsResponse
+
+from common import config
+
+# Params that say which day a response covers up to (LeagueDash windows, scoreboards)
+DATE_PARAMS = ['date_to_nullable', 'game_date']
+
+def parse_date(value):
+    """Converts a date, datetime or MM/DD/YYYY / YYYY-MM-DD string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(str(value), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def get_expiry(params, as_of=None):
+    """Returns when a response expires: never (None) if it covers days before yesterday, else after the short TTL"""
+    if as_of is None:
+        as_of = next((params[name] for name in DATE_PARAMS if params.get(name)), None)
+    as_of = parse_date(as_of) if as_of is not None else None
+    if as_of is not None and as_of < date.today() - timedelta(days=1):
+        return None  # Finished games and closed windows never change
+    return time.time() + config.NBA_API_CACHE_TTL
+
+def _path(key):
+    """Returns the cache file for a request key (endpoint name and normalized params)"""
+    digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+    return os.path.join(config.NBA_API_CACHE_DIR, digest[:2], f"{digest}.json")
+
+def load(key):
+    """Returns the cached raw response for a request, or None if it is missing or expired"""
+    if not config.NBA_API_CACHE_DIR:
+        return None
+    try:
+        with open(_path(key)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry['expires_at'] is not None and entry['expires_at'] < time.time():
+        return None
+    return entry['response']
+
+def save(key, response, expires_at):
+    """Stores a raw response, writing to a temp file first so a crash never leaves half a file"""
+    if not config.NBA_API_CACHE_DIR:
+        return
+    path = _path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'key': key, 'stored_at': time.time(), 'expires_at': expires_at, 'response': response}, f)
+    os.replace(tmp_path, path)
+
+def rebuild(endpoint_cls, params, response):
+    """Builds an endpoint object from a cached response without touching the network"""
+    endpoint = endpoint_cls(**params, get_request=False)
+    endpoint.nba_response = NBAStatsResponse(response=response, status_code=200, url=None)
+    endpoint.load_response()
+    return endpoint
@@ -0,0 +1,200 @@
+"""Rolling per-game averages computed locally from game logs with an incremental sliding window
+
+Instead of asking stats.nba.com for a 14-day LeagueDash window per target date, the games are ingested once
+(common/gamelogs.py) and each date's window is the previous one plus the newest day minus the day that fell
+out. Output rows have the same shape as the player_traditional / opp_traditional LeagueDash tables.
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+from common import config, gamelogs, leaguedash, ledger, telemetry
+from common.datasets import DATASETS
+from common.db import connect_to_sql
+
+class SlidingWindow:
+    """Per-key sums over the last `days` days plus the current one, advanced one day at a time"""
+
+    def __init__(self, days):
+        self.days = days
+        self.sums = None
+        self.daily = {}  # day -> per-key sums of that day's games
+
+    def advance(self, day, day_sums):
+        """Adds the newest day and subtracts the day that fell out of the window"""
+        self.daily[day] = day_sums
+        self.sums = day_sums if self.sums is None else self.sums.add(day_sums, fill_value=0)
+        expired = self.daily.pop(day - timedelta(days=self.days + 1), None)
+        if expired is not None:
+            self.sums = self.sums.sub(expired, fill_value=0)
+            self.sums = self.sums[self.sums['GP'] > 0]  # Drop keys with no games left in the window
+
+def get_pct(made, attempted):
+    """Shooting percentage from window totals, 0 when nothing was attempted"""
+    return (made / attempted.where(attempted > 0)).fillna(0).round(3)
+
+def add_ranks(df, columns, ascending):
+    """Ranks every column across the league the way the LeagueDash _RANK columns do (1 is best)"""
+    for column in columns:
+        df[f'{column}_RANK'] = df[column].rank(method='min', ascending=column in ascending).astype(float)
+
+class Rollup:
+    """Turns game log rows into per-game values and window sums into table rows"""
+    game_log = None
+    key = None
+    labels = []  # Columns kept from each key's most recent game
+    requests_per_season = len(gamelogs.SEASON_TYPES)  # One game log request per season type
+
+    def __init__(self, seasons):
+        self.seasons = seasons
+
+    def prepare(self, logs):
+        """Per-game values summed by the window"""
+        games = logs.copy()
+        games['GP'] = 1.0
+        return games
+
+class PlayerTraditional(Rollup):
+    """player_traditional rows from player_game_log"""
+    game_log = 'player_game_log'
+    key = 'PLAYER_ID'
+    labels = ['Team', 'Player', 'TEAM_ID']
+    # Per-game averages and the columns they are stored as
+    averages = {'MIN': 'MIN', 'FGM': 'FGM', 'FGA': 'FGA', 'FG3M': '3PM', 'FG3A': '3PA', 'FTM': 'FTM', 'FTA': 'FTA',
+                'OREB': 'OREB', 'DREB': 'DREB', 'REB': 'REB', 'AST': 'AST', 'TOV': 'TOV', 'STL': 'STL', 'BLK': 'BLK',
+                'BLKA': 'BLKA', 'PF': 'PF', 'PFD': 'PFD', 'PTS': 'PPG', 'PLUS_MINUS': 'PLUS_MINUS',
+                'NBA_FANTASY_PTS': 'NBA_FANTASY_PPG'}
+    # Stats where fewer is better
+    ascending = {'L', 'TOV', 'BLKA', 'PF'}
+    requests_per_season = Rollup.requests_per_season + 1  # Plus the age request
+
+    def __init__(self, seasons):
+        super().__init__(seasons)
+        # AGE is not in the game logs: one season-level request per season
+        self.ages = {}
+        for season in seasons:
+            self.ages.update(gamelogs.get_ages(season))
+
+    def build(self, day, sums, labels):
+        gp = sums['GP']
+        df = pd.DataFrame(index=sums.index)
+        df['Date'] = day
+        df['Team'] = [labels[key]['Team'] for key in sums.index]
+        df['Player'] = [labels[key]['Player'] for key in sums.index]
+        df['TEAM_ID'] = [labels[key]['TEAM_ID'] for key in sums.index]
+        df['PLAYER_ID'] = sums.index
+        df['AGE'] = sums.index.map(self.ages).astype(float)
+        df['GP'] = gp
+        df['W'] = sums['W']
+        df['L'] = gp - sums['W']
+        df['W_PCT'] = (sums['W'] / gp).round(3)
+        for stat, column in self.averages.items():
+            df[column] = (sums[stat] / gp).round(1)
+        df['FG_PCT'] = get_pct(sums['FGM'], sums['FGA'])
+        df['3P_PCT'] = get_pct(sums['FG3M'], sums['FG3A'])
+        df['FT_PCT'] = get_pct(sums['FTM'], sums['FTA'])
+        df['DD2'] = sums['DD2']
+        df['TD3'] = sums['TD3']
+        stat_columns = [column for column in DATASETS['player_traditional'].columns
+                        if not column.endswith('_RANK') and column != 'AGE']
+        add_ranks(df, stat_columns, self.ascending)
+        return df
+
+class OppTraditional(Rollup):
+    """opp_traditional rows from team_game_log: each team's opponents' per-game stats"""
+    game_log = 'team_game_log'
+    key = 'Team'
+    labels = ['TEAM_ID']
+    stats = {'FGM': 'OPP_FGM', 'FGA': 'OPP_FGA', 'FG3M': 'OPP_3PM', 'FG3A': 'OPP_3PA', 'FTM': 'OPP_FTM',
+             'FTA': 'OPP_FTA', 'OREB': 'OPP_OREB', 'DREB': 'OPP_DREB', 'REB': 'OPP_REB', 'AST': 'OPP_AST',
+             'TOV': 'OPP_TOV', 'STL': 'OPP_STL', 'BLK': 'OPP_BLK', 'BLKA': 'OPP_BLKA', 'PF': 'OPP_PF',
+             'PFD': 'OPP_PFD', 'PTS': 'OPP_PTS'}
+    # Opponent stats rank 1 when the opponents did the least, except the ones that help the defense
+    descending = {'OPP_TOV', 'OPP_PF', 'OPP_BLKA', 'PLUS_MINUS'}
+
+    def prepare(self, logs):
+        """Pairs each team's game with its opponent's line from the same game"""
+        opponents = logs[['GAME_ID', 'Team'] + list(self.stats)].rename(
+            columns={'Team': 'OPP_TEAM', **self.stats})
+        games = logs[['GAME_ID', 'Date', 'Team', 'TEAM_ID', 'PLUS_MINUS']].merge(opponents, on='GAME_ID')
+        games = games[games['Team'] != games['OPP_TEAM']].drop(columns=['OPP_TEAM'])
+        games['GP'] = 1.0
+        return games
+
+    def build(self, day, sums, labels):
+        gp = sums['GP']
+        df = pd.DataFrame(index=sums.index)
+        df['Date'] = day
+        df['Team'] = sums.index
+        df['TEAM_ID'] = [labels[key]['TEAM_ID'] for key in sums.index]
+        for column in list(self.stats.values()) + ['PLUS_MINUS']:
+            df[column] = (sums[column] / gp).round(1)
+        df['OPP_FG_PCT'] = get_pct(sums['OPP_FGM'], sums['OPP_FGA'])
+        df['OPP_3P_PCT'] = get_pct(sums['OPP_3PM'], sums['OPP_3PA'])
+        df['OPP_FT_PCT'] = get_pct(sums['OPP_FTM'], sums['OPP_FTA'])
+        stat_columns = [column for column in DATASETS['opp_traditional'].columns if not column.endswith('_RANK')]
+        ascending = set(stat_columns) - self.descending
+        add_ranks(df, stat_columns, ascending)
+        return df
+
+ROLLUPS = {
+    'player_traditional': PlayerTraditional,
+    'opp_traditional': OppTraditional,
+}
+
+def run_rolling(table_name, context):
+    """Fills the missing dates of a LeagueDash-shaped table from game logs instead of per-date API windows"""
+    spec = DATASETS[table_name]
+    target_date = context.target_date
+    days_to_scrape = (target_date - context.season_start).days
+    with connect_to_sql() as (cursor, conn):
+        leaguedash.create_table(cursor, conn, spec)
+        ledger.seed(cursor, table_name, table_name)
+        conn.commit()
+        dates_to_scrape = set(ledger.get_dates_to_scrape(cursor, table_name, target_date, days_to_scrape))
+    if not dates_to_scrape:
+        print("No new data to scrape.")
+        return
+
+    # Ingest only the games not seen before, then load every game the windows need
+    window_start = min(dates_to_scrape) - timedelta(days=leaguedash.LAST_X_DAYS)
+    last_date = max(dates_to_scrape)
+    rollup_cls = ROLLUPS[table_name]
+    gamelogs.ingest(rollup_cls.game_log, window_start, last_date)
+    logs = gamelogs.load(rollup_cls.game_log, window_start, last_date, season_type='Regular Season')
+    seasons = sorted({gamelogs.get_season(day) for day in dates_to_scrape})
+    rollup = rollup_cls(seasons)
+    games = rollup.prepare(logs)
+    value_columns = games.select_dtypes('number').columns.drop(['PLAYER_ID', 'TEAM_ID'], errors='ignore')
+    games_by_day = dict(list(games.groupby('Date')))
+
+    # Slide the window one day at a time, keeping each key's most recent team and name
+    window = SlidingWindow(leaguedash.LAST_X_DAYS)
+    labels = {}
+    dataframes = []
+    windows = []
+    day = window_start
+    while day <= last_date:
+        day_games = games_by_day.get(day, games.iloc[0:0])
+        window.advance(day, day_games.groupby(rollup.key)[value_columns].sum())
+        if rollup.labels:
+            labels.update(day_games.groupby(rollup.key)[rollup.labels].last().to_dict('index'))
+        if day in dates_to_scrape and len(window.sums):
+            df = rollup.build(day, window.sums, labels)[spec.key + spec.id_columns + spec.columns].fillna(0)
+            telemetry.emit('rows_parsed', table=table_name, rows=len(df))
+            dataframes.append(df)
+            windows.append((day, df))
+            print(f"Computed {spec.label} data for {day}")
+        elif day in dates_to_scrape:
+            windows.append((day, 0))
+        day += timedelta(days=1)
+
+    if dataframes:
+        data = pd.concat(dataframes, ignore_index=True)
+        for start in range(0, len(data), config.PIPELINE_BATCH_ROWS):
+            leaguedash.export_data_to_sql(data.iloc[start:start + config.PIPELINE_BATCH_ROWS], table_name)
+        print(f"Exported {len(data)} rows to {table_name}")
+    else:
+        print("No games in the windows to export.")
+    # Days whose window has no games (the offseason) are recorded as empty so they are not recomputed
+    ledger.record(table_name, windows)
@@ -0,0 +1,57 @@
+"""Natural keys and secondary indexes of the stat tables, and the upserts that write through them
+
+Each table declares a unique natural key (e.g. Date, Team, Player) next to its CREATE TABLE. `ensure_keys` adds the
+key and any missing indexes to tables created before they existed, removing duplicate rows first, so reruns
+overwrite rows instead of inserting them twice.
+"""
+NATURAL_KEY = 'natural_key'
+
+def get_index_name(columns):
+    """Name of the secondary index over some columns"""
+    return 'idx_' + '_'.join(column.lower() for column in columns)
+
+def get_indexes(cursor, table_name):
+    """Returns the names of the indexes a table already has"""
+    cursor.execute(f"SHOW INDEX FROM {table_name}")
+    key_name = [column[0] for column in cursor.description].index('Key_name')
+    return set(row[key_name] for row in cursor.fetchall())
+
+def remove_duplicates(cursor, table_name, unique_key):
+    """Deletes every row sharing its natural key with a newer row (the last write wins, like an upsert)"""
+    key_columns = ', '.join(f'`{column}`' for column in unique_key)
+    query = f'''
+    DELETE {table_name} FROM {table_name}
+    LEFT JOIN (
+        SELECT MAX(id) AS id
+        FROM {table_name}
+        GROUP BY {key_columns}
+    ) AS newest ON {table_name}.id = newest.id
+    WHERE newest.id IS NULL
+    '''
+    cursor.execute(query)
+    return cursor.rowcount
+
+def ensure_keys(cursor, table_name, unique_key, indexes=()):
+    """Adds the natural key and secondary indexes a table is missing, migrating its rows in place"""
+    existing = get_indexes(cursor, table_name)
+    changes = []
+    if NATURAL_KEY not in existing:
+        removed = remove_duplicates(cursor, table_name, unique_key)
+        if removed:
+            print(f"Removed {removed} duplicate rows from {table_name}")
+        changes.append(f"ADD UNIQUE KEY {NATURAL_KEY} ({', '.join(f'`{column}`' for column in unique_key)})")
+    for columns in indexes:
+        if get_index_name(columns) not in existing:
+            changes.append(f"ADD INDEX {get_index_name(columns)} ({', '.join(f'`{column}`' for column in columns)})")
+    if changes:
+        # One ALTER so the table is rebuilt once
+        cursor.execute(f"ALTER TABLE {table_name} {', '.join(changes)}")
+
+def get_upsert_query(table_name, columns):
+    """INSERT that overwrites the row with the same natural key instead of adding a second one"""
+    columns = [f'`{column}`' for column in columns]
+    return f'''
+    INSERT INTO {table_name} ({', '.join(columns)})
+    VALUES ({', '.join(['%s'] * len(columns))})
+    ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in columns)}
+    '''
@@ -0,0 +1,133 @@
+"""Structured pipeline telemetry written as JSON lines, plus the --profile summary built from it"""
+import contextvars
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from common import config
+
+# Name of the scraper the current thread is working for (set by run_scrapers.py)
+current_scraper = contextvars.ContextVar(
+    'current_scraper', default=os.getenv('SCRAPER_NAME') or os.path.basename(sys.argv[0])
+)
+
+_write_lock = threading.Lock()
+
+# Upper bounds (seconds) of the API latency histogram buckets
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 5, 10, float('inf')]
+
+def get_run_id():
+    """Returns the id of this pipeline run, shared with any child processes through the environment"""
+    return os.environ.setdefault('PIPELINE_RUN_ID', uuid.uuid4().hex[:12])
+
+def rss_to_mb(ru_maxrss):
+    """Converts a ru_maxrss value to MB (Linux reports kilobytes, macOS reports bytes)"""
+    return ru_maxrss / (1024 * 1024) if sys.platform == 'darwin' else ru_maxrss / 1024
+
+def get_peak_rss_mb():
+    """Returns the peak resident set size of this process in MB"""
+    return rss_to_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+def emit(event, **fields):
+    """Appends one telemetry event to the JSON lines file"""
+    if not config.TELEMETRY_PATH:
+        return
+    record = {
+        'ts': round(time.time(), 3),
+        'run_id': get_run_id(),
+        'scraper': current_scraper.get(),
+        'event': event,
+        **fields
+    }
+    line = json.dumps(record, default=str) + '\n'
+    with _write_lock:
+        with open(config.TELEMETRY_PATH, 'a') as f:
+            f.write(line)
+
+@contextmanager
+def timed(event, **fields):
+    """Emits `event` with the time spent inside the block and whether it raised"""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield fields  # Callers can add fields (e.g. row counts) while the block runs
+        ok = True
+    finally:
+        emit(event, seconds=round(time.perf_counter() - start, 4), ok=ok, **fields)
+
+def load_events(run_id):
+    """Reads every telemetry event recorded for a run"""
+    events = []
+    if not config.TELEMETRY_PATH or not os.path.exists(config.TELEMETRY_PATH):
+        return events
+    with open(config.TELEMETRY_PATH) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Skip lines cut short by a crash
+            if record.get('run_id') == run_id:
+                events.append(record)
+    return events
+
+def percentile(values, pct):
+    """Returns the nearest-rank percentile of a list of numbers"""
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+def print_profile(run_id):
+    """Prints per-scraper and per-endpoint summary tables for a run"""
+    events = load_events(run_id)
+    scrapers = {}
+    endpoints = {}
+    for record in events:
+        stats = scrapers.setdefault(record['scraper'], {
+            'seconds': 0.0, 'api_calls': 0, 'api_seconds': 0.0, 'retries': 0, 'coalesced': 0, 'cached': 0,
+            'rows_parsed': 0, 'rows_inserted': 0, 'db_seconds': 0.0, 'peak_rss_mb': 0.0
+        })
+        if record['event'] == 'api_call':
+            stats['api_calls'] += 1
+            stats['api_seconds'] += record['seconds']
+            stats['retries'] += 1 if record['attempt'] > 0 else 0
+            endpoints.setdefault(record['endpoint'], []).append(record['seconds'])
+        elif record['event'] == 'api_coalesced':
+            stats['coalesced'] += 1
+        elif record['event'] == 'api_cache_hit':
+            stats['cached'] += 1
+        elif record['event'] == 'rows_parsed':
+            stats['rows_parsed'] += record['rows']
+        elif record['event'] == 'db_write':
+            stats['rows_inserted'] += record['rows'] if record['ok'] else 0
+            stats['db_seconds'] += record['seconds']
+        elif record['event'] == 'scraper_done':
+            stats['seconds'] = record['seconds']
+            stats['peak_rss_mb'] = max(stats['peak_rss_mb'], record['peak_rss_mb'])
+
+    print(f"\nProfile for run {run_id}:")
+    header = f"  {'scraper':<24}{'total s':>9}{'api calls':>11}{'api s':>9}{'retries':>9}" \
+             f"{'shared':>8}{'cached':>8}{'parsed':>10}{'inserted':>10}{'db s':>8}{'rss MB':>9}"
+    print(header)
+    for name, stats in sorted(scrapers.items(), key=lambda item: -item[1]['seconds']):
+        print(f"  {name:<24}{stats['seconds']:>9.1f}{stats['api_calls']:>11}{stats['api_seconds']:>9.1f}"
+              f"{stats['retries']:>9}{stats['coalesced']:>8}{stats['cached']:>8}"
+              f"{stats['rows_parsed']:>10}{stats['rows_inserted']:>10}"
+              f"{stats['db_seconds']:>8.1f}{stats['peak_rss_mb']:>9.0f}")
+
+    if endpoints:
+        print("\n  API latency by endpoint (seconds):")
+        bucket_labels = ''.join(f"{'<=' + str(b) if b != float('inf') else '>' + str(LATENCY_BUCKETS[-2]):>8}"
+                                for b in LATENCY_BUCKETS)
+        print(f"  {'endpoint':<32}{'calls':>7}{'p50':>7}{'p95':>7}{'max':>7}{bucket_labels}")
+        for endpoint, latencies in sorted(endpoints.items()):
+            counts = [0] * len(LATENCY_BUCKETS)
+            for latency in latencies:
+                counts[next(i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound)] += 1
+            print(f"  {endpoint:<32}{len(latencies):>7}{percentile(latencies, 50):>7.2f}"
+                  f"{percentile(latencies, 95):>7.2f}{max(latencies):>7.2f}"
+                  + ''.join(f"{count:>8}" for count in counts))
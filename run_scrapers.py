@@ -1,9 +1,21 @@
 """
 Automated NBA Player Data Scraper Script
 
-This script automates the process of scraping data from various sources using web scrapers. It records the start time, runs the 
-web scrapers to collect data, waits for a few seconds between each scraper execution to avoid overloading the servers, and 
-then runs the projection models. Finally, it records the end time and calculates the elapsed time for the entire process.
+This script automates the process of scraping data from various sources using web scrapers. It records the start time, runs the
+web scrapers as a dependency graph (independent scrapers run concurrently, dependent ones wait for their inputs), and then runs
+the projection models. A failed scraper only cancels the scripts downstream of it. Finally, it reports the time taken by each
+script, the critical path through the graph and the elapsed time for the entire process.
+
+By default every scraper is imported once and its `run(context)` entry point is called from a small pool of worker threads in
+this process, so pandas, nba_api and the database driver are only imported once. Pass --subprocess to run each script in its
+own interpreter instead.
+
+Every stage appends structured telemetry (API latency, retries, rows parsed and inserted, DB write time and peak RSS) to
+telemetry.jsonl. Pass --profile to print a summary table for the run at the end.
+
+Pass --backfill START END to fill every API table over a date range instead: the script first prints the missing dates,
+the stats.nba.com requests needed and the time they take under the rate limit, then runs the tables in priority order
+(add --dry-run to only print the plan).
 
 Author: Brandon Lee
 Date: April 7th, 2024
@@ -12,51 +24,216 @@ Requirements:
 - Python 3.x
 - Subprocess module
 - Time module
-- Multiprocessing module
-- Web scraper scripts (located in scrapers directory)
+- Concurrent.futures module
+- Web scraper scripts (registered in common/registry.py)
 
 """
 ## Import libraries
+import argparse
+import os
 import subprocess
 import time
-import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+
+from common import planner, registry, telemetry
+from common.context import ScraperContext
+
+def validate_dag(dag):
+    """Checks that every dependency is a known script and that the graph has no cycles"""
+    for script, deps in dag.items():
+        for dep in deps:
+            if dep not in dag:
+                raise ValueError(f"{script} depends on unknown script {dep}")
+
+    # Depth-first search for back edges
+    visiting, visited = set(), set()
+    def visit(script):
+        if script in visited:
+            return
+        if script in visiting:
+            raise ValueError(f"Dependency cycle detected at {script}")
+        visiting.add(script)
+        for dep in dag[script]:
+            visit(dep)
+        visiting.remove(script)
+        visited.add(script)
+
+    for script in dag:
+        visit(script)
 
 # Function to run each scraper script
-def run_scraper(script):
-    subprocess.run(["python", script])
+def run_scraper(name):
+    """Runs a scraper script in its own process and returns its start time, end time and exit code"""
+    start = time.time()
+    process = subprocess.Popen(["python", registry.get_script_path(name)], env={**os.environ, 'SCRAPER_NAME': name})
+    # Reap the child ourselves to get its resource usage
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = returncode = os.waitstatus_to_exitcode(status)
+    telemetry.emit('scraper_done', scraper=name, seconds=round(time.time() - start, 3), returncode=returncode,
+                   peak_rss_mb=round(telemetry.rss_to_mb(rusage.ru_maxrss), 1))
+    return start, time.time(), returncode
+
+def run_scraper_in_process(name, context):
+    """Calls a scraper's entry point in this process and returns its start time, end time and exit code"""
+    telemetry.current_scraper.set(name)
+    start = time.time()
+    try:
+        registry.load_entry_point(name)(context)
+        returncode = 0
+    except Exception as e:
+        print(f"An error occurred in {name}:", e)
+        returncode = 1
+    # Peak RSS is shared by every scraper running in this process
+    telemetry.emit('scraper_done', seconds=round(time.time() - start, 3), returncode=returncode,
+                   peak_rss_mb=round(telemetry.get_peak_rss_mb(), 1))
+    return start, time.time(), returncode
+
+def get_path_lengths(dag):
+    """Returns the number of scripts on the longest chain from each script to the end of the graph, itself included"""
+    dependents = {script: [] for script in dag}
+    for script, deps in dag.items():
+        for dep in deps:
+            dependents[dep].append(script)
+
+    lengths = {}
+    def visit(script):
+        if script not in lengths:
+            lengths[script] = 1 + max((visit(dependent) for dependent in dependents[script]), default=0)
+        return lengths[script]
+
+    for script in dag:
+        visit(script)
+    return lengths
+
+def run_dag(dag, max_processes, run_node):
+    """Runs each script once all of its dependencies have succeeded and a worker is free
+
+    Ready scripts wait in this function rather than in the executor's queue, so every free worker goes to the ready
+    script with the longest chain of scripts still behind it (ties keep the order of `dag`, e.g. the backfill
+    priority).
+    """
+    validate_dag(dag)
+    lengths = get_path_lengths(dag)
+    status = {}   # script -> 'ok', 'failed' or 'skipped'
+    timings = {}  # script -> (start, end)
+    pending = dict(dag)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_processes) as executor:
+        while pending or running:
+            # Skip scripts downstream of a failure (repeat until no more skips cascade)
+            skipped = True
+            while skipped:
+                skipped = False
+                for script, deps in list(pending.items()):
+                    if any(status.get(dep) in ('failed', 'skipped') for dep in deps):
+                        status[script] = 'skipped'
+                        del pending[script]
+                        skipped = True
+                        print(f"Skipping {script}: an upstream script failed")
+
+            # Fill the free workers with the ready scripts on the longest chains
+            ready = [script for script, deps in pending.items() if all(status.get(dep) == 'ok' for dep in deps)]
+            ready.sort(key=lambda script: -lengths[script])
+            for script in ready[:max_processes - len(running)]:
+                running[executor.submit(run_node, script)] = script
+                del pending[script]
+
+            if not running:
+                break
+
+            # Wait for at least one script to finish before rescheduling
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                script = running.pop(future)
+                try:
+                    start, end, returncode = future.result()
+                except Exception as e:
+                    print(f"An error occurred running {script}:", e)
+                    start = end = time.time()
+                    returncode = -1
+                timings[script] = (start, end)
+                status[script] = 'ok' if returncode == 0 else 'failed'
+                if returncode != 0:
+                    print(f"{script} failed with exit code {returncode}")
+
+    return status, timings
+
+def get_critical_path(dag, timings):
+    """Walks back from the last script to finish through the dependency that finished last"""
+    if not timings:
+        return []
+    script = max(timings, key=lambda s: timings[s][1])
+    path = [script]
+    while True:
+        deps = [dep for dep in dag[script] if dep in timings]
+        if not deps:
+            break
+        script = max(deps, key=lambda s: timings[s][1])
+        path.append(script)
+    return path[::-1]
+
+def print_report(dag, status, timings, elapsed_time):
+    """Prints the status and duration of each script followed by the critical path"""
+    print("\nScript summary:")
+    for script in dag:
+        if script in timings:
+            start, end = timings[script]
+            print(f"  {status[script]:<8} {end - start:8.1f}s  {script}")
+        else:
+            print(f"  {status.get(script, 'skipped'):<8} {'-':>8}   {script}")
+
+    critical_path = get_critical_path(dag, timings)
+    if critical_path:
+        path_time = timings[critical_path[-1]][1] - timings[critical_path[0]][0]
+        print(f"\nCritical path ({path_time:.1f}s of {elapsed_time:.1f}s):")
+        for script in critical_path:
+            start, end = timings[script]
+            print(f"  {end - start:8.1f}s  {script}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scrapers and projections as a dependency graph")
+    parser.add_argument("--max-processes", type=int, default=4, help="Max number of scripts to run at once")
+    parser.add_argument("--subprocess", action="store_true", help="Run each script in its own interpreter")
+    parser.add_argument("--profile", action="store_true", help="Print a telemetry summary table at the end")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), type=date.fromisoformat,
+                        help="Fill every API table from START to END (YYYY-MM-DD) in priority order")
+    parser.add_argument("--dry-run", action="store_true", help="With --backfill, only print the plan")
+    args = parser.parse_args()
+    if args.backfill and args.subprocess:
+        parser.error("--backfill runs the scrapers in this process and cannot be combined with --subprocess")
+
     start_time = time.time() # Record Start time
+    run_id = telemetry.get_run_id()  # Exported to the environment so subprocesses log under the same run
+    dag = {name: entry['deps'] for name, entry in registry.SCRAPERS.items()}
+    context = ScraperContext()
+
+    if args.backfill:
+        # Plan the range, then only run the tables with missing dates, highest priority first
+        start_date, end_date = args.backfill
+        context = ScraperContext(today=end_date + timedelta(days=1), season_start=start_date, backfill=True)
+        plan = planner.plan_backfill(context)
+        planner.print_plan(plan, context)
+        if args.dry_run:
+            raise SystemExit(0)
+        dag = {entry['name']: [] for entry in plan if entry['dates']}
+
+    if args.subprocess:
+        run_node = run_scraper
+    else:
+        # Import every entry point up front so the workers share one warm interpreter
+        for name in dag:
+            registry.load_entry_point(name)
+        print(f"Loaded {len(dag)} entry points in {time.time() - start_time:.1f} seconds.")
+        run_node = lambda name: run_scraper_in_process(name, context)
 
-    # List of scraper scripts to run
-    scraper_scripts = [
-        "scrapers-gamelog/scrape_boxscores.py",
-        "scrapers-misc/scrape_dk_props.py",
-        "scrapers-misc/scrape_games.py",
-        "scrapers-injuries/scrape_injuries.py",
-        "scrapers-injuries/parse_past_injuries.py",
-        "scrapers-team-api/scrape_traditional_team.py",
-        "scrapers-team-api/scrape_misc_team.py",
-        "scrapers-team-api/scrape_playtype_team.py",
-        "scrapers-team-api/scrape_zone_team.py",
-        "scrapers-player-api/scrape_misc_player.py",
-        "scrapers-player-api/scrape_playtype_player.py",
-        "scrapers-player-api/scrape_traditional_player.py",
-        "scrapers-player-api/scrape_zone_player.py"
-    ]
-
-    # Specify max number of processes
-    max_processes = 1
-
-    # Create a pool of worker processes
-    pool = multiprocessing.Pool(processes=max_processes)
-
-    # Run each scraper script asynchronously
-    pool.map(run_scraper, scraper_scripts)
-
-    pool.close()
-    pool.join()
+    # Run the scrapers, launching independent scripts concurrently
+    status, timings = run_dag(dag, args.max_processes, run_node)
 
     end_time = time.time()  # Record end time
     elapsed_time = end_time - start_time  # Calculate elapsed time
+    print_report(dag, status, timings, elapsed_time)
     print(f"Scrapers Complete. Time taken: {elapsed_time} seconds.")
+    if args.profile:
+        telemetry.print_profile(run_id)
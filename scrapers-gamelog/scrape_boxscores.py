@@ -1,43 +1,25 @@
 from nba_api.stats.endpoints import boxscoretraditionalv3
 from nba_api.stats.endpoints import ScoreboardV2
 from nba_api.stats.static import teams
-from datetime import datetime, timedelta
 import os
-import time
-import mysql.connector
-from contextlib import contextmanager
-from dotenv import load_dotenv
-import unicodedata
-
-@contextmanager
-def connect_to_sql():
-    """Connects to the SQL using contextmanager to efficiently manage the connection and cursor"""
-    conn = None
-    cursor = None  # Initialize cursor to None
-    try:
-        # Load the .env file
-        load_dotenv()
-
-        # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
-        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-        raise  # Re-raise the exception to handle it outside
-    finally:
-        # Close cursor and conn after usage
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-
-def create_table(cursor, table_name):
+import sys
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import async_fetch, config, dimensions, gamelogs, ledger, names, nba_client, schema, telemetry
+from common.context import ScraperContext
+from common.db import connect_to_sql, insert_batches
+
+# Team ID columns and the abbreviation columns they are resolved from
+TEAM_ID_COLUMNS = {'TEAM_ID': 'Team', 'OPP_TEAM_ID': 'Opp_Team', 'HOME_TEAM_ID': 'Home_Team'}
+COLUMNS = ['GameID', 'Date', 'Home_Team', 'Team', 'Player', 'Opp_Team', 'Points', 'Minutes', 'PLAYER_ID',
+           'TEAM_ID', 'OPP_TEAM_ID', 'HOME_TEAM_ID']
+
+def create_table(cursor, conn, table_name):
     """Creates a new table if it does not exist in the MySQL database"""
     # Define the query to create the table
     create_table_query = f'''
@@ -50,94 +32,38 @@ def create_table(cursor, table_name):
         `Player` VARCHAR(255),
         `Opp_Team` VARCHAR(255),
         `Points` FLOAT,
-        `Minutes` FLOAT
+        `Minutes` FLOAT,
+        PLAYER_ID INT,
+        TEAM_ID INT,
+        OPP_TEAM_ID INT,
+        HOME_TEAM_ID INT
     )
     '''
     cursor.execute(create_table_query)
+    # Date leads the key so date range probes use it; GameID lookups get their own index
+    schema.ensure_keys(cursor, table_name, ['Date', 'GameID', 'Team', 'Player'], indexes=[['GameID']])
+    # Tables created before the IDs were stored get them from the names of their rows
+    dimensions.add_id_columns(cursor, conn, table_name, TEAM_ID_COLUMNS, {'PLAYER_ID': 'Player'})
 
-def insert_data(cursor, data, table_name):
-    """Inserts data into the MySQL database """
-    insert_query = f'''
-    INSERT INTO `{table_name}` (`GameID`, `Date`, `Home_Team`, `Team`, `Player`, `Opp_Team`, `Points`, `Minutes`) 
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    '''
-    cursor.executemany(insert_query, data)
+def insert_data(cursor, conn, data, table_name):
+    """Inserts data into the MySQL database in batches"""
+    insert_query = schema.get_upsert_query(table_name, COLUMNS)
+    insert_batches(cursor, conn, insert_query, data)
 
 def export_data_to_sql(data, table_name):
     """Exports the data to the MySQL database """
-    with connect_to_sql() as (cursor, conn):
+    with telemetry.timed('db_write', table=table_name, rows=len(data)), connect_to_sql() as (cursor, conn):
         # Create table
-        create_table(cursor, table_name)
+        create_table(cursor, conn, table_name)
 
-        # Check if player names match NBA.com
-        check_names(cursor, data)
+        # The player IDs come from the API; the opponent and home team are resolved from their abbreviations
+        dimensions.register_players(cursor, conn, data)
+        data = data.assign(OPP_TEAM_ID=dimensions.resolve_teams(cursor, conn, data['Opp_Team']).values,
+                           HOME_TEAM_ID=dimensions.resolve_teams(cursor, conn, data['Home_Team']).values)
 
         # Insert data
-        data_to_insert = [(item['GameID'], item['Date'], item['Home_Team'], item['Team'], item['Player'], 
-                           item['Opp_Team'], item['Points'], item['Minutes']) 
-                          for item in data]
-        insert_data(cursor, data_to_insert, table_name)
-        conn.commit()
-
-def manage_table(cursor, table_name, target_date, days_to_scrape):
-    # Define the query to remove data older than X days
-    query_remove = f"""
-    DELETE FROM {table_name}
-    WHERE Date < DATE_SUB('{target_date}', INTERVAL {days_to_scrape} DAY);
-    """
-
-    # Define the query to find distinct dates scraped
-    query_find_dates_scraped = f"""
-    SELECT DISTINCT Date
-    FROM {table_name}
-    """
-
-    # Execute the query to remove data older than X days
-    # cursor.execute(query_remove)
-
-    # Execute the query to find the dates scraped
-    cursor.execute(query_find_dates_scraped)
-    unique_dates = cursor.fetchall()
-    dates_scraped = set(date[0] for date in unique_dates)
-
-    # Generate list of dates
-    date_range = [
-        (target_date - timedelta(days=i))
-        for i in range(days_to_scrape + 1)
-    ]
-
-    dates_to_scrape = list(set(date_range) - dates_scraped)
-
-    return sorted(dates_to_scrape)[::-1]
-
-def remove_diacritics(input_str):
-    # Normalize the string to decompose characters with diacritics
-    normalized = unicodedata.normalize('NFD', input_str)
-    # Remove diacritics by filtering out characters in the 'Mn' category (mark, nonspacing)
-    without_diacritics = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
-    return without_diacritics
-
-def check_names(cursor, data):
-    try:
-        # Query to check if player names are in the MySQL database
-        query = "SELECT Player FROM player_traditional"
-        cursor.execute(query)
-        result = cursor.fetchall()
-
-        # Store the player names in a set
-        player_names = set()
-        for player in result:
-            player_names.add(player[0])
-        
-        # Iterate through the player names in the data
-        for item in data:
-            if item['Player'] not in player_names:
-                print(f"WARNING: {item['Player']} not found on NBA.com")
-
-    except Exception as e:
-        print("An error occurred:", e)
-        # Exit the script upon encountering an error
-        exit()
+        data_to_insert = list(data[COLUMNS].itertuples(index=False, name=None))
+        insert_data(cursor, conn, data_to_insert, table_name)
 
 def scrape_game_data(game_date):
     def get_team_name(team_id):
@@ -150,7 +76,7 @@ def scrape_game_data(game_date):
         "day_offset": "0"
     }
 
-    games = ScoreboardV2(**params, timeout=30)
+    games = nba_client.fetch(ScoreboardV2, **params, timeout=30)
     games_dict = games.get_dict()
     result_sets = games_dict.get('resultSets')[0].get('rowSet')
 
@@ -172,18 +98,14 @@ def scrape_game_data(game_date):
     
     return game_data
 
+def convert_time_to_minutes(times):
+    """Converts MM:SS (or plain minute) strings to decimal minutes, 0 when they cannot be parsed"""
+    times = times.fillna('').astype(str).str.strip()
+    minutes_seconds = times.str.extract(r'^(\d+):(\d+)$').astype(float)
+    plain_minutes = pd.to_numeric(times, errors='coerce')
+    return (minutes_seconds[0] + minutes_seconds[1] / 60).fillna(plain_minutes).fillna(0.0)
+
 def scrape_box_score(data):
-    def convert_time_to_minutes(time_str):
-        try:
-            time_str = time_str.strip()
-            if ':' in time_str:
-                minutes, seconds = time_str.split(':')
-                return int(minutes) + int(seconds) / 60
-            else:
-                return float(time_str)
-        except ValueError:
-            return 0.0
-    
     game_id = data['game_id']
     game_date = data['game_data']
     home_team = data['home_team']
@@ -196,9 +118,9 @@ def scrape_box_score(data):
         "range_type": 0
     }
 
-    # Error handling for the API call
+    # Error handling for the API call (None marks the game as failed so its date is retried)
     try:
-        boxscore = boxscoretraditionalv3.BoxScoreTraditionalV3(**params, timeout=10)
+        boxscore = nba_client.fetch(boxscoretraditionalv3.BoxScoreTraditionalV3, as_of=game_date, **params, timeout=10)
     except AttributeError as e:
         print("Encountered an AttributeError:", e)
         return
@@ -206,93 +128,133 @@ def scrape_box_score(data):
         print("An error occurred:", e)
         return
 
-    # Continue if there's a response
+    # Continue if there's a response, keeping only players who got minutes
     player_stats = boxscore.get_data_frames()[0]
-    output_data = []
-
-    for player in player_stats.iterrows():
-        minutes = player[1]['minutes']
-        total_minutes = convert_time_to_minutes(minutes)
-        if total_minutes:
-            player_name = (player[1]['firstName'] + ' ' + player[1]['familyName'])
-            player_name = remove_diacritics(player_name) # Remove diacritics from player name
-            player_name = player_name.replace(' Jr.', '') # Remove 'Jr.' from player name
-            points = player[1]['points']
-            team_name = player[1]['teamTricode']
-
-            opp_team = next(team for team in data['team_names'] if team != team_name)
-
-            output_data.append({'GameID': int(game_id),
-                                'Date': game_date,
-                                'Home_Team': home_team,
-                                'Team': team_name,
-                                'Player': player_name, 
-                                'Opp_Team': opp_team,
-                                'Points': points,
-                                'Minutes': total_minutes})
-    return output_data
-
-def is_boxscore_already_in_db(cursor, table_name, game_id):
+    total_minutes = convert_time_to_minutes(player_stats['minutes'])
+    player_stats = player_stats[total_minutes != 0]
+
+    # Remove diacritics and 'Jr.' from player names
+    player_names = names.normalize(player_stats['firstName'] + ' ' + player_stats['familyName'])
+    team_names = player_stats['teamTricode']
+    first_team, second_team = data['team_names']
+
+    return pd.DataFrame({
+        'GameID': int(game_id),
+        'Date': game_date,
+        'Home_Team': home_team,
+        'Team': team_names,
+        'Player': player_names,
+        'Opp_Team': np.where(team_names == first_team, second_team, first_team),
+        'Points': player_stats['points'],
+        'Minutes': total_minutes[player_stats.index],
+        'PLAYER_ID': player_stats['personId'],
+        'TEAM_ID': player_stats['teamId']
+    })
+
+def scrape_game_logs(start_date, end_date):
+    """Builds box score rows for every game between two dates from the league-wide player game logs"""
+    gamelogs.ingest('player_game_log', start_date, end_date)
+    logs = gamelogs.load('player_game_log', start_date, end_date)
+    logs = logs[logs['MIN'] > 0]
+
+    # MATCHUP is "BOS vs. NYK" for home games and "BOS @ NYK" for away games
+    matchup = logs['MATCHUP'].str.extract(r'^(\w+) (vs\.|@) (\w+)$')
+    return pd.DataFrame({
+        'GameID': logs['GAME_ID'].astype(int),
+        'Date': logs['Date'],
+        'Home_Team': np.where(matchup[1] == 'vs.', matchup[0], matchup[2]),
+        'Team': logs['Team'],
+        'Player': logs['Player'],
+        'Opp_Team': matchup[2],
+        'Points': logs['PTS'],
+        'Minutes': logs['MIN'],
+        'PLAYER_ID': logs['PLAYER_ID'],
+        'TEAM_ID': logs['TEAM_ID']
+    })
+
+def get_scraped_game_ids(cursor, table_name, start_date, end_date):
+    """Returns the GameIDs already stored for a date range, in one query"""
     query = f"""
-    SELECT COUNT(*)
+    SELECT DISTINCT GameID
     FROM {table_name}
-    WHERE GameID = '{game_id}';
+    WHERE Date BETWEEN %s AND %s;
     """
-    cursor.execute(query)
-    result = cursor.fetchone()
-    return result[0] > 0
+    cursor.execute(query, (start_date, end_date))
+    return set(row[0] for row in cursor.fetchall())
 
-def main():
-    game_data = []
-    todays_date = datetime.today().date()  # get today's date
-    target_date = todays_date - timedelta(days=1) # subtract 1 day to get yesterday's date
-    days_to_scrape = 65 # retrieve data for the last 14 days
+def run(context):
+    target_date = context.target_date # yesterday's date
+    days_to_scrape = 65 # retrieve data for the last 65 days
+    if context.backfill:
+        days_to_scrape = (target_date - context.season_start).days
 
-    # Remove data older than X days and get the latest date
+    # Find the dates not recorded in the scrape ledger yet
     with connect_to_sql() as (cursor, conn):
         # Create the table
-        create_table(cursor, 'player_boxscore')
-        dates_to_scrape = manage_table(cursor, 'player_boxscore', target_date, days_to_scrape)
+        create_table(cursor, conn, 'player_boxscore')
+        # Older runs marked days without games with 'n/a' rows; they become empty ledger entries
+        ledger.seed(cursor, 'player_boxscore', 'player_boxscore', empty_condition="Player = 'n/a'")
+        conn.commit()
+        dates_to_scrape = ledger.get_dates_to_scrape(cursor, 'player_boxscore', target_date, days_to_scrape)
         if not dates_to_scrape:
             print("No new data to scrape.")
             return
 
-    # Scrape game data for the last X days
-    for date in dates_to_scrape:
-        data = scrape_game_data(date)
-        if not data:
-            with connect_to_sql() as (cursor, conn):
-                insert_query = f'''
-                INSERT INTO `{'player_boxscore'}` (`GameID`, `Date`, `Home_Team`, `Team`, `Player`, `Opp_Team`, `Points`, `Minutes`) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                '''
-                cursor.execute(insert_query, [0, date, 0, "n/a", "n/a", "n/a", 0, 0])
-                conn.commit()
-        else:
-            game_data += data
-        time.sleep(0.7)
-        print(f"Scraped game data for {date}")
-
-    # Remove games that are already in the database
-    game_data_copy = game_data.copy()
-    with connect_to_sql() as (cursor, conn):
-        for data in game_data_copy:
-            if is_boxscore_already_in_db(cursor, 'player_boxscore', data['game_id']):
-                game_data.remove(data)
+        # Find the games already stored for these dates in one query
+        scraped_game_ids = get_scraped_game_ids(cursor, 'player_boxscore', min(dates_to_scrape), max(dates_to_scrape))
 
-    # Scrape box scores for the games
+    done_dates = set()
+    failed_dates = set()
     output_data = []
-    for data in game_data:
-        boxscore_data = scrape_box_score(data)
-        if boxscore_data:
-            output_data += boxscore_data
-        time.sleep(0.7)
-        print(f"Scraped box score for {data['game_data']}")
-    
+
+    # Older dates come from the league-wide game logs in a few requests per season; the target date keeps the
+    # per-game box scores so same-day stat corrections are picked up
+    bulk_dates = [date for date in dates_to_scrape if date < target_date] if config.BOXSCORE_BULK_INGEST else []
+    if bulk_dates:
+        game_logs = scrape_game_logs(min(bulk_dates), max(bulk_dates))
+        game_logs = game_logs[game_logs['Date'].isin(bulk_dates) & ~game_logs['GameID'].isin(scraped_game_ids)]
+        done_dates.update(bulk_dates)
+        telemetry.emit('rows_parsed', table='player_boxscore', rows=len(game_logs))
+        output_data.append(game_logs)
+        print(f"Scraped {len(game_logs)} box score rows for {len(bulk_dates)} dates from the game logs")
+    per_game_dates = [date for date in dates_to_scrape if date not in bulk_dates]
+
+    # Fetch the scoreboards concurrently; each one feeds its new games to a bounded pool of box score fetchers
+    boxscore_futures = {}
+    with ThreadPoolExecutor(max_workers=config.NBA_API_CONCURRENCY) as boxscore_pool:
+        def on_scoreboard(window, game_data):
+            date = window[0]
+            if game_data is None:
+                return  # The scoreboard request failed; the date stays missing and is retried next run
+            done_dates.add(date)
+            for data in game_data:
+                if int(data['game_id']) not in scraped_game_ids:
+                    # Copy the context so telemetry from the pool is tagged with this scraper
+                    future = boxscore_pool.submit(contextvars.copy_context().run, scrape_box_score, data)
+                    boxscore_futures[future] = date
+            print(f"Scraped game data for {date}")
+
+        async_fetch.fetch_windows(scrape_game_data, [(date,) for date in per_game_dates], on_scoreboard)
+
+        # Collect the box scores as they finish
+        for future in as_completed(boxscore_futures):
+            boxscore_data = future.result()
+            if boxscore_data is None:
+                failed_dates.add(boxscore_futures[future])
+            elif not boxscore_data.empty:
+                game = boxscore_data.iloc[0]
+                telemetry.emit('rows_parsed', table='player_boxscore', game_id=int(game['GameID']),
+                               rows=len(boxscore_data))
+                output_data.append(boxscore_data)
+                print(f"Scraped box score for {game['Date']}")
+
     # Export data to SQL if new data was scraped
     if output_data:
-        export_data_to_sql(output_data, 'player_boxscore')
+        export_data_to_sql(pd.concat(output_data, ignore_index=True), 'player_boxscore')
+
+    # Record the dates whose games are all stored (days without games become empty entries)
+    ledger.record_from_table('player_boxscore', 'player_boxscore', sorted(done_dates - failed_dates))
 
 if __name__ == '__main__':
-    main()
+    run(ScraperContext())
 
@@ -1,115 +1,87 @@
-import mysql.connector
 import os
-from contextlib import contextmanager
-from dotenv import load_dotenv
-from datetime import date
-from contextlib import contextmanager
+import sys
 
-@contextmanager
-def connect_to_sql():
-    """Connects to the SQL using contextmanager to efficiently manage the connection and cursor"""
-    conn = None
-    cursor = None  # Initialize cursor to None
-    try:
-        # Load the .env file
-        load_dotenv()
-
-        # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
-        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-        raise  # Re-raise the exception to handle it outside
-    finally:
-        # Close cursor and conn after usage
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import telemetry
+from common.context import ScraperContext
+from common.db import connect_to_sql, load_snapshot
 
 def create_table(cursor, table_name):
     """Creates a new table if it does not exist in the MySQL database"""
-    #  Drop the table if it exists
-    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-
     # Define the query to create the table
     create_table_query = f'''
     CREATE TABLE IF NOT EXISTS {table_name} (
         id INT AUTO_INCREMENT PRIMARY KEY,
         `Date` DATE,
         `Team` VARCHAR(255),
-        `Player` VARCHAR(255)
+        `Player` VARCHAR(255),
+        TEAM_ID INT,
+        PLAYER_ID INT
     )
     '''
     cursor.execute(create_table_query)
 
 def export_data_to_sql(data, table_name):
     """Exports the data to the MySQL database"""
-    with connect_to_sql() as (cursor, conn):
-        # Create the table if it does not exist
-        create_table(cursor, table_name)
-
-        # Insert the data into the table
-        for row in data:
-            cursor.execute(f"INSERT INTO {table_name} (`Date`, `Team`, `Player`) VALUES (%s, %s, %s)", row)
-        conn.commit()
+    with telemetry.timed('db_write', table=table_name, rows=len(data)), connect_to_sql() as (cursor, conn):
+        # Load a staging table and swap it in, so readers never see the table empty or half loaded
+        load_snapshot(cursor, conn, table_name, create_table, ['Date', 'Team', 'Player', 'TEAM_ID', 'PLAYER_ID'],
+                      data)
 
 def fetch_all_players():
     with connect_to_sql() as (cursor, conn):
-        cursor.execute("SELECT DISTINCT team, player FROM player_traditional")
+        cursor.execute('''
+        SELECT DISTINCT TEAM_ID, PLAYER_ID, Team, Player
+        FROM player_traditional
+        WHERE TEAM_ID IS NOT NULL AND PLAYER_ID IS NOT NULL
+        ''')
         unique_players = cursor.fetchall()
-    
-    # Create a dictionary to store the players by team
+
+    # Create a dictionary to store the players (ID -> team and name) by team ID
     players_by_team = {}
-    for team, player in unique_players:
-        if team not in players_by_team:
-            players_by_team[team] = set()
-        player = player.replace(' Jr.', '')
-        players_by_team[team].add(player)
+    for team_id, player_id, team, player in unique_players:
+        if team_id not in players_by_team:
+            players_by_team[team_id] = {}
+        players_by_team[team_id][player_id] = (team, player)
     return players_by_team
 
 def fetch_all_boxscore():
     with connect_to_sql() as (cursor, conn):
-        # select team and player grouped by date
-        cursor.execute("SELECT date, team, player FROM player_boxscore")
+        # Rows without IDs (e.g. the old 'n/a' placeholders) are not games
+        cursor.execute('''
+        SELECT `Date`, TEAM_ID, PLAYER_ID
+        FROM player_boxscore
+        WHERE TEAM_ID IS NOT NULL AND PLAYER_ID IS NOT NULL
+        ''')
         boxscore_data = cursor.fetchall()
-    
-    # Create a dictionary to store the players by team and date
+
+    # Create a dictionary to store the player IDs by team ID and date
     players_by_team_date = {}
-    for date, team, player in boxscore_data:
+    for date, team_id, player_id in boxscore_data:
         if date not in players_by_team_date:
             players_by_team_date[date] = {}
-        if team not in players_by_team_date[date]:
-            players_by_team_date[date][team] = set()
-        player = player.replace(' Jr.', '')
-        players_by_team_date[date][team].add(player)
-
-    # Remove if key is n/a
-    for date, team_player_dict in players_by_team_date.items():
-        if 'n/a' in team_player_dict:
-            del team_player_dict['n/a']
+        if team_id not in players_by_team_date[date]:
+            players_by_team_date[date][team_id] = set()
+        players_by_team_date[date][team_id].add(player_id)
 
     return players_by_team_date
 
-if __name__ == '__main__':
+def run(context):
     players_by_team_dict = fetch_all_players()
     boxscore_by_date_dict = fetch_all_boxscore()
     injured_players_by_date = []
 
     for date, team_player_dict in boxscore_by_date_dict.items():
-        for team, players in team_player_dict.items():
-            injured_players = players_by_team_dict[team] - players
-            for player in injured_players:
-                injured_players_by_date.append((date, team, player))
+        for team_id, players in team_player_dict.items():
+            roster = players_by_team_dict.get(team_id, {})
+            for player_id in roster.keys() - players:
+                team, player = roster[player_id]
+                injured_players_by_date.append((date, team, player, team_id, player_id))
         
     # Export the data to the MySQL database
     export_data_to_sql(injured_players_by_date, 'player_injuries')
     
 
-
+if __name__ == '__main__':
+    run(ScraperContext())
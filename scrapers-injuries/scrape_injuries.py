@@ -4,66 +4,43 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
-import mysql.connector
 import os
-from contextlib import contextmanager
-from dotenv import load_dotenv
-from datetime import date
 import sys
 
-@contextmanager
-def connect_to_sql():
-    """Connects to the SQL using contextmanager to efficiently manage the connection and cursor"""
-    conn = None
-    try:
-        # Load the .env file
-        load_dotenv()
-
-        # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
-        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-    finally:  # Close cursor and conn after usage
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import dimensions, names, telemetry
+from common.context import ScraperContext
+from common.db import connect_to_sql, load_snapshot
 
 def create_table(cursor, table_name):
     """Creates a new table if it does not exist in the MySQL database"""
-    #  Drop the table if it exists
-    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-
     # Define the query to create the table
     create_table_query = f'''
     CREATE TABLE IF NOT EXISTS {table_name} (
         id INT AUTO_INCREMENT PRIMARY KEY,
         `Date` DATE,
         `Team` VARCHAR(255),
-        `Player` VARCHAR(255)
+        `Player` VARCHAR(255),
+        TEAM_ID INT,
+        PLAYER_ID INT
     )
     '''
     cursor.execute(create_table_query)
 
 def export_data_to_sql(data, table_name):
     """Exports the data to the MySQL database"""
-    with connect_to_sql() as (cursor, conn):
-        # Create the table if it does not exist
-        create_table(cursor, table_name)
+    with telemetry.timed('db_write', table=table_name, rows=len(data)), connect_to_sql() as (cursor, conn):
+        # Resolve the ESPN names to NBA IDs once, here, so the models join on the IDs
+        team_ids = dimensions.resolve_teams(cursor, conn, [team for _, team, _ in data])
+        player_ids = dimensions.resolve_players(cursor, conn, [player for _, _, player in data])
+        data = [row + (team_id, player_id) for row, team_id, player_id in zip(data, team_ids, player_ids)]
 
-        # Insert the data into the table
-        for row in data:
-            cursor.execute(f"INSERT INTO {table_name} (`Date`, `Team`, `Player`) VALUES (%s, %s, %s)", row)
-        conn.commit()
+        # Load a staging table and swap it in, so readers never see the table empty or half loaded
+        load_snapshot(cursor, conn, table_name, create_table, ['Date', 'Team', 'Player', 'TEAM_ID', 'PLAYER_ID'],
+                      data)
 
-if __name__ == '__main__':
+def run(context):
     # Scrape the injury report from ESPN
     url = 'https://www.espn.com/nba/injuries'
 
@@ -81,7 +58,9 @@ if __name__ == '__main__':
         team_tables = soup.find_all('div', class_='ResponsiveTable Table__league-injuries') 
     except Exception as e:
         print(driver.page_source)
-        sys.exit(f'Error fetching injury report: {e}')
+        raise RuntimeError(f'Error fetching injury report: {e}')
+    finally:
+        driver.quit()
 
 
     # Define a dictionary to map abbreviations to full team names
@@ -108,21 +87,24 @@ if __name__ == '__main__':
         injury_description = table.find_all('td', class_='col-desc Table__TD')
 
         for player, return_date, status, description in zip(players, est_return, injury_status, injury_description):
-            # Remove 'Jr. ' from the player name
-            player = player.text.replace(' Jr.', '')
+            player = player.text
 
             # Map team name to abbreviation
             team_name_abbreviation = team_mapping.get(team_name, team_name)
             
             # If player is guranteed or most likely to be out, add to the list
             if 'Out' in status.text:
-                injured_players.append(((date.today()).strftime('%Y/%m/%d'), team_name_abbreviation, player))
+                injured_players.append((context.today.strftime('%Y/%m/%d'), team_name_abbreviation, player))
     
+    # Remove 'Jr.' and diacritics from the player names, once per distinct name
+    player_names = names.normalize([player for _, _, player in injured_players])
+    injured_players = [(day, team, player) for (day, team, _), player in zip(injured_players, player_names)]
+
+    telemetry.emit('rows_parsed', table='injury_report', rows=len(injured_players))
     if len(injured_players) == 0:
-        sys.exit('Error fetching injury report: No injured players found')
+        raise RuntimeError('Error fetching injury report: No injured players found')
 
     export_data_to_sql(injured_players, 'injury_report')
 
-    
-
-
+if __name__ == '__main__':
+    run(ScraperContext())
@@ -6,35 +6,13 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import os
-from datetime import date
-from contextlib import contextmanager
-import mysql.connector
-from dotenv import load_dotenv
-
-@contextmanager
-def connect_to_sql():
-    """Connects to the SQL using contextmanager to efficiently manage the connection and cursor"""
-    conn = None
-    try:
-        # Load the .env file
-        load_dotenv()
-
-        # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
-        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-    finally: # close cursor and conn after usage
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close() 
+import sys
+
+# Make the shared modules in the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import dimensions, telemetry
+from common.context import ScraperContext
+from common.db import connect_to_sql, load_snapshot
 
 def scrape_data(url):
     options = Options()
@@ -102,45 +80,33 @@ def parse_table(html_contents):
     return teams
         
 def create_table(cursor, table_name):
-    """Drops table if it exists then creates new one in MySQL database"""
-    # Define the query to drop table
-    drop_table_query = f'''
-    DROP TABLE IF EXISTS {table_name}
-    '''
-
+    """Creates a new table in the MySQL database"""
     create_table_query = f'''
     CREATE TABLE IF NOT EXISTS {table_name} (
         id INT AUTO_INCREMENT PRIMARY KEY,
         `Away_Team` VARCHAR(255),
-        `Home_Team` VARCHAR(255)
+        `Home_Team` VARCHAR(255),
+        AWAY_TEAM_ID INT,
+        HOME_TEAM_ID INT
     )
     '''
-    cursor.execute(drop_table_query)
     cursor.execute(create_table_query)
 
-def insert_data(cursor, data, table_name):
-    """Inserts data into the MySQL database """
-    insert_query = f'''
-    INSERT INTO `{table_name}` (`Away_Team`, `Home_Team`) 
-    VALUES (%s, %s)
-    '''
-    cursor.executemany(insert_query, data)
-
 def export_data_to_sql(data, table_name):
     """Exports the data to the MySQL database """
-    with connect_to_sql() as (cursor, conn):
-        # Create table
-        create_table(cursor, table_name)
-
-        # Insert data
-        data_to_insert = [(data['Away_Team'][i], data['Home_Team'][i]) for i in range(len(data['Away_Team']))]
+    with telemetry.timed('db_write', table=table_name, rows=len(data['Away_Team'])), connect_to_sql() as (cursor, conn):
+        # Resolve the team abbreviations to NBA IDs
+        away_ids = dimensions.resolve_teams(cursor, conn, data['Away_Team'])
+        home_ids = dimensions.resolve_teams(cursor, conn, data['Home_Team'])
 
-        insert_data(cursor, data_to_insert, table_name)
-        conn.commit()
+        # Load a staging table and swap it in, so readers never see the table empty
+        data_to_insert = list(zip(data['Away_Team'], data['Home_Team'], away_ids, home_ids))
+        columns = ['Away_Team', 'Home_Team', 'AWAY_TEAM_ID', 'HOME_TEAM_ID']
+        load_snapshot(cursor, conn, table_name, create_table, columns, data_to_insert)
 
-def main():
+def run(context):
     # Get today's date
-    today = date.today()
+    today = context.today
     year, month, day = today.year, today.month, today.day
     # Add leading zero to month and day if less than 10
     if day < 10:
@@ -156,6 +122,7 @@ def main():
     url = f"https://www.nba.com/games?date={year}-{month}-{day}"
     html_contents = scrape_data(url)
     data = parse_table(html_contents)
+    telemetry.emit('rows_parsed', table='nba_matchups', rows=len(data['Away_Team']))
 
     # Export Data
     export_data_to_sql(data, 'nba_matchups')
@@ -163,4 +130,5 @@ def main():
 
 # Call the main function
 if __name__ == "__main__":
-    main()
+    run(ScraperContext())
+
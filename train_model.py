@@ -1,9 +1,6 @@
 # Baseline model for predicting player points in NBA games (using only PPG as the predictor)
 # MAE: 4.75
-import mysql.connector
 import os
-from contextlib import contextmanager
-from dotenv import load_dotenv
 import pandas as pd
 import random
 from datetime import date
@@ -24,47 +21,16 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
 import numpy as np
 import matplotlib.pyplot as plt
-
-@contextmanager
-def connect_to_sql():
-    """Connects to the SQL using contextmanager to efficiently manage the connection and cursor"""
-    conn = None
-    try:
-        # Load the .env file
-        load_dotenv()
-
-        # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
-        yield cursor, conn  # Yield both cursor and connection to use inside the `with` block
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-    finally:  # Close cursor and conn after usage
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-
-def load_data_from_sql(query):
-    """Loads data from the MySQL database"""
-    with connect_to_sql() as (cursor, conn):
-        cursor.execute(query)
-        columns = [i[0] for i in cursor.description]
-        data = cursor.fetchall()
-    return pd.DataFrame(data, columns=columns)
+from common import loader
+from common.loader import load_data_from_sql
 
 def append_days_since_last_game(df):
     # Append days since last game
     df['Date1'] = pd.to_datetime(df['Date'])
-    df = df.sort_values(by=['Player', 'Date1'])
+    df = df.sort_values(by=['PLAYER_ID', 'Date1'])
     df['Previous_Game_Date'] = (
         df
-        .groupby('Player')['Date1']
+        .groupby('PLAYER_ID')['Date1']
         .shift(1)
     )
     df['Days_Since_Last_Game'] = (df['Date1'] - df['Previous_Game_Date']).dt.days
@@ -80,54 +46,50 @@ def append_days_since_last_game(df):
 
 def process_injury_data(df):
     # Load injury data
-    query = "SELECT * FROM player_injuries"
-    injured_players = load_data_from_sql(query)
-    injured_players.drop(columns=['id'], inplace=True)
+    injured_players = load_data_from_sql('player_injuries', ['Date', 'TEAM_ID', 'PLAYER_ID'])
 
     # Merge injured players with player data
-    injured_df = df.merge(injured_players, on=['Team', 'Player', 'Date'], how='inner')
+    injured_df = df.merge(injured_players, on=loader.PLAYER_KEY, how='inner').drop(columns=['PLAYER_ID'])
 
-    # Group by 'Date' and 'Team' and calculate the sum of all numeric columns
+    # Group by 'Date' and 'TEAM_ID' and calculate the sum of all numeric columns
     aggregated_df = (
         injured_df
-        .groupby(['Date', 'Team'])
+        .groupby(['Date', 'TEAM_ID'])
         .sum(numeric_only=True)
         .reset_index()
     )
 
     # Add suffix to distinguish new aggregated columns
     aggregated_df = aggregated_df.add_suffix('_unknown')
-    aggregated_df.rename(columns={'Date_unknown': 'Date', 'Team_unknown': 'Team'}, inplace=True)
+    aggregated_df.rename(columns={'Date_unknown': 'Date', 'TEAM_ID_unknown': 'TEAM_ID'}, inplace=True)
 
     # Merge the aggregated data back to the original dataframe
-    df = df.merge(aggregated_df, on=['Date', 'Team'], how='left')
+    df = df.merge(aggregated_df, on=['Date', 'TEAM_ID'], how='left')
 
     return df
 
 def preprocess_data(player_data, player_tables, opp_data, opp_tables):
     # Merge all player_tables
-    player_df = reduce(lambda left, right: pd.merge(left, right, on=['Team', 'Player', 'Date'], how='outer'), player_data.values())
+    player_df = reduce(lambda left, right: pd.merge(left, right, on=loader.PLAYER_KEY, how='outer'), player_data.values())
     player_df.fillna(0, inplace=True)
-    player_df['Player'] = player_df['Player'].apply(lambda x: x.replace(' Jr.', ''))
     player_df = process_injury_data(player_df) # Process injury data
 
     # Merge all opp_tables
-    opp_df = reduce(lambda left, right: pd.merge(left, right, on=['Opp_Team', 'Date'], how='inner'), opp_data.values())
+    opp_df = reduce(lambda left, right: pd.merge(left, right, on=['OPP_TEAM_ID', 'Date'], how='inner'), opp_data.values())
 
     # Merge boxscore with player_df to get train_df
-    query = "SELECT * FROM player_boxscore"
-    boxscore = load_data_from_sql(query)
-    boxscore['Player'] = boxscore['Player'].apply(lambda x: x.replace(' Jr.', ''))
+    boxscore = load_data_from_sql(
+        'player_boxscore', ['Date', 'HOME_TEAM_ID', 'TEAM_ID', 'PLAYER_ID', 'OPP_TEAM_ID', 'Points'])
     train_df = player_df.merge(
-        boxscore.drop(columns=['GameID', 'id']), 
-        on=['Team', 'Player', 'Date'], 
+        boxscore,
+        on=loader.PLAYER_KEY,
         how='inner'
         )
-    train_df = train_df.merge(opp_df, on=['Opp_Team', 'Date'], how='inner')
+    train_df = train_df.merge(opp_df, on=['OPP_TEAM_ID', 'Date'], how='inner')
 
     # Append is_back_to_back and home court advantage
-    train_df['Home_Court_Advantage'] = train_df.apply(lambda row: 1 if row['Home_Team'] == row['Team'] else 0, axis=1)
-    train_df = train_df.drop(columns=['Home_Team'])
+    train_df['Home_Court_Advantage'] = (train_df['HOME_TEAM_ID'] == train_df['TEAM_ID']).astype(int)
+    train_df = train_df.drop(columns=['HOME_TEAM_ID'])
     train_df = append_days_since_last_game(train_df)
 
     return train_df
@@ -187,61 +149,24 @@ def get_feature_importance(model, features):
 
 if __name__ == '__main__':
     # Define the tables to be used
-    player_tables = ['player_playtype', 'player_misc', 'player_shot_locations', 'player_traditional']
-    opp_tables = ['opp_playtype', 'opp_misc', 'opp_shot_locations', 'opp_traditional']
-
-    # Load player data from SQL
-    player_data = {}
-    for table in player_tables:
-        query = f"SELECT * FROM {table}"
-        player_data[table] = load_data_from_sql(query)
-        player_data[table]['Date'] = (pd.to_datetime(player_data[table]['Date']) + timedelta(days=1)).dt.date # Shift the date by 1 day
-        if 'id' in player_data[table].columns:
-            player_data[table] = player_data[table].drop(columns=['id'])
-        if 'GameID' in player_data[table].columns:
-            player_data[table] = player_data[table].drop(columns=['GameID'])
+    player_tables = list(loader.PLAYER_TABLES)
+    opp_tables = list(loader.OPP_TABLES)
+
+    # Load the key and feature columns of the player tables from SQL
+    player_data = loader.load_feature_tables(loader.PLAYER_TABLES, loader.PLAYER_KEY)
 
     # Load opponent data from SQL
-    opp_data = {}
+    opp_data = loader.load_feature_tables(loader.OPP_TABLES, loader.OPP_KEY)
     for table in opp_tables:
-        query = f"SELECT * FROM {table}"
-        opp_data[table] = load_data_from_sql(query)
-        opp_data[table] = opp_data[table].rename(columns={'Team': 'Opp_Team'})
-        opp_data[table]['Date'] = (pd.to_datetime(opp_data[table]['Date']) + timedelta(days=1)).dt.date # Shift the date by 1 day
-        if 'id' in opp_data[table].columns:
-            opp_data[table] = opp_data[table].drop(columns=['id'])
+        opp_data[table] = opp_data[table].rename(columns={'TEAM_ID': 'OPP_TEAM_ID'})
 
     # Preprocess the data
     train_df = preprocess_data(player_data, player_tables, opp_data, opp_tables)
     train_df.to_csv('train_df.csv', index=False)
 
-    # Create feature sets
-    playtype = ['2FGA_cns', '3PA_cns', '2FGA_pullup', '3PA_pullup']
-
-    zone = ['RA_FGA', 'Mid_FGA', 'LC3_FGA', 'RC3_FGA', 'C3_FGA', 'AB3_FGA']
-
-    opp_playtype = ['Opp_2FGA_cns', 'Opp_3PA_cns', 'Opp_2FGA_pullup', 'Opp_3PA_pullup']
-
-    opp_zone = ['Opp_RA_FGA', 'Opp_Mid_FGA', 'Opp_LC3_FGA', 'Opp_RC3_FGA', 'Opp_C3_FGA', 'Opp_AB3_FGA']
-    
-    misc = ['PTS_OFF_TOV', 'PTS_2ND_CHANCE', 'PTS_FB', 'PTS_PAINT']
-
-    opp_misc = ['OPP_PTS_OFF_TOV', 'OPP_PTS_2ND_CHANCE', 'OPP_PTS_FB', 'OPP_PTS_PAINT']
-
-    injury = ['2FGA_cns_unknown', '3PA_cns_unknown', '2FGA_pullup_unknown', '3PA_pullup_unknown',
-            'RA_FGA_unknown', 'Mid_FGA_unknown', 'LC3_FGA_unknown',  'RC3_FGA_unknown', 
-            'C3_FGA_unknown', 'AB3_FGA_unknown', 'PTS_OFF_TOV_unknown',
-            'PTS_2ND_CHANCE_unknown', 'PTS_FB_unknown', 'PTS_PAINT_unknown']
-
-    traditional = ['AGE', 'W_PCT', 'MIN', 'FGA', '3PA', 'FTA', 'FG_PCT', '3P_PCT']
-
-    opp_traditional = ['OPP_FGM', 'OPP_FGA', 'OPP_3PA', 'OPP_FTA', 'OPP_FG_PCT', 'OPP_3P_PCT']
-
-    context = ['Is_Back_To_Back', 'Home_Court_Advantage']
-
     # Define features and label
-    features = playtype + zone + misc + traditional + opp_playtype + opp_zone + opp_misc + opp_traditional + injury  + context
-    label = 'Points'
+    features = loader.FEATURES
+    label = loader.LABEL
 
     # Prepare feature matrix and target vector
     X = train_df[features]